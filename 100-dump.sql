@@ -40,7 +40,9 @@ CREATE TABLE `amenities` (
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `name` varchar(128) NOT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  KEY `ix_amenities_created_at_id` (`created_at`,`id`),
+  KEY `ix_amenities_updated_at` (`updated_at`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -68,6 +70,9 @@ CREATE TABLE `cities` (
   `name` varchar(128) NOT NULL,
   `state_id` varchar(60) NOT NULL,
   PRIMARY KEY (`id`),
+  KEY `ix_cities_created_at_id` (`created_at`,`id`),
+  KEY `ix_cities_name` (`name`),
+  KEY `ix_cities_updated_at` (`updated_at`),
   KEY `state_id` (`state_id`),
   CONSTRAINT `cities_ibfk_1` FOREIGN KEY (`state_id`) REFERENCES `states` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
@@ -132,6 +137,9 @@ CREATE TABLE `places` (
   `latitude` float DEFAULT NULL,
   `longitude` float DEFAULT NULL,
   PRIMARY KEY (`id`),
+  KEY `ix_places_created_at_id` (`created_at`,`id`),
+  KEY `ix_places_price_by_night` (`price_by_night`),
+  KEY `ix_places_updated_at` (`updated_at`),
   KEY `city_id` (`city_id`),
   KEY `user_id` (`user_id`),
   CONSTRAINT `places_ibfk_1` FOREIGN KEY (`city_id`) REFERENCES `cities` (`id`),
@@ -164,6 +172,8 @@ CREATE TABLE `reviews` (
   `user_id` varchar(60) NOT NULL,
   `text` varchar(1024) NOT NULL,
   PRIMARY KEY (`id`),
+  KEY `ix_reviews_created_at_id` (`created_at`,`id`),
+  KEY `ix_reviews_updated_at` (`updated_at`),
   KEY `place_id` (`place_id`),
   KEY `user_id` (`user_id`),
   CONSTRAINT `reviews_ibfk_1` FOREIGN KEY (`place_id`) REFERENCES `places` (`id`),
@@ -193,7 +203,10 @@ CREATE TABLE `states` (
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `name` varchar(128) NOT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  KEY `ix_states_created_at_id` (`created_at`,`id`),
+  KEY `ix_states_name` (`name`),
+  KEY `ix_states_updated_at` (`updated_at`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -222,7 +235,10 @@ CREATE TABLE `users` (
   `password` varchar(128) NOT NULL,
   `first_name` varchar(128) DEFAULT NULL,
   `last_name` varchar(128) DEFAULT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  KEY `ix_users_created_at_id` (`created_at`,`id`),
+  KEY `ix_users_email` (`email`),
+  KEY `ix_users_updated_at` (`updated_at`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -11,7 +11,25 @@ app = Flask(__name__)
 # Create a CORS instance and allow all origins
 app.register_blueprint(app_views)
 app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
-CORS(app, resources={r"/api/*": {"origins": "0.0.0.0"}})
+CORS(app, resources={r"/api/*": {"origins": "0.0.0.0"}},
+     expose_headers=["X-Next-Cursor"])
+
+
+@app.before_request
+def reset_query_count():
+    """Starts counting the storage queries of the request"""
+    storage.queries(reset=True)
+
+
+@app.after_request
+def query_count(response):
+    """
+    Returns the number of storage queries of the request in the
+    X-Query-Count header when HBNB_API_QUERY_COUNT=1
+    """
+    if os.getenv('HBNB_API_QUERY_COUNT') == '1':
+        response.headers["X-Query-Count"] = str(storage.queries())
+    return response
 
 
 @app.teardown_appcontext
@@ -4,6 +4,7 @@ Create a new view for Amenity objects that handles all default RESTFul
 API actions.
 """
 from api.v1.views import app_views
+from api.v1.views.paging import paginate
 from flask import jsonify, abort, request
 from models import storage
 
@@ -11,11 +12,10 @@ from models import storage
 @app_views.route("/amenities", methods=["GET"], strict_slashes=False)
 def all_amenities():
     """
-    Retrieves the list of all Amenity objects.
+    Retrieves the list of all Amenity objects, or a page of them.
     """
-    amenities = [amenity.to_dict()
-                 for amenity in storage.all("Amenity").values()]
-    return jsonify(amenities)
+    return paginate(lambda limit, after:
+                    storage.all("Amenity", limit, after).values())
 
 
 @app_views.route("/amenities/<path:amenity_id>", methods=["GET"],
@@ -18,11 +18,12 @@ def stats():
     """
     Retrieves the number of each objects by type
     """
+    counts = storage.counts()
     return jsonify({
-        "amenities": storage.count("Amenity"),
-        "cities": storage.count("City"),
-        "places": storage.count("Place"),
-        "reviews": storage.count("Review"),
-        "states": storage.count("State"),
-        "users": storage.count("User")
+        "amenities": counts["Amenity"],
+        "cities": counts["City"],
+        "places": counts["Place"],
+        "reviews": counts["Review"],
+        "states": counts["State"],
+        "users": counts["User"]
     })
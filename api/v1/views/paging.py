@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Contains the keyset pagination of the list endpoints
+"""
+from flask import jsonify, abort, request
+from models.engine import pagination
+
+# number of objects of a page when only a cursor is given
+page_size = 100
+
+
+def paginate(fetch):
+    """
+    Returns the JSON list of the objects fetch(limit, after) returns
+
+    Without the limit and cursor query arguments, every object is listed.
+    Otherwise one page is, and the cursor of the next page, if any, is
+    returned in the X-Next-Cursor header.
+
+    Args:
+        fetch (function): returns the objects of a page like storage.all()
+            and storage.filter() do, or all of them for (None, None)
+    """
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    if limit is None and cursor is None:
+        return jsonify([obj.to_dict() for obj in fetch(None, None)])
+    try:
+        limit = int(limit) if limit is not None else page_size
+    except ValueError:
+        abort(400, "Invalid limit")
+    if limit < 1:
+        abort(400, "Invalid limit")
+    try:
+        # one more object tells whether there is a next page
+        objs = list(fetch(limit + 1, cursor or None))
+    except ValueError:
+        abort(400, "Invalid cursor")
+    response = jsonify([obj.to_dict() for obj in objs[:limit]])
+    if len(objs) > limit:
+        response.headers["X-Next-Cursor"] = pagination.encode(
+            objs[limit - 1])
+    return response
@@ -4,6 +4,7 @@ Create a new view for Place objects that handles all default RESTFul
 API actions.
 """
 from api.v1.views import app_views
+from api.v1.views.paging import paginate
 from flask import jsonify, abort, request
 from models import storage
 from os import environ
@@ -14,16 +15,17 @@ STORAGE_TYPE = environ.get('HBNB_TYPE_STORAGE')
                  strict_slashes=False)
 def all_places(city_id):
     """
-    Retrieves the list of all Place objects of a City.
+    Retrieves the list of all Place objects of a City, or a page of them.
     """
     from models.city import City
+    from models.place import Place
     city = storage.get(City, city_id)
 
     if city is None:
         abort(404)
 
-    places = [place.to_dict() for place in city.places]
-    return jsonify(places)
+    return paginate(lambda limit, after:
+                    storage.filter(Place, limit, after, city_id=city.id))
 
 
 @app_views.route("/places/<path:place_id>", methods=["GET"],
@@ -128,64 +130,8 @@ def places_search():
     cities = data_body.get("cities", [])
     amenities = data_body.get("amenities", [])
 
-    if not data_body or len(data_body) < 1 or\
-            (not states and not cities and not amenities):
-        from models.place import Place
-        places = storage.all(Place).values()
-        list_of_places = [place.to_dict() for place in places]
-        return jsonify(list_of_places), 200
-
-    list_of_places = []
-
-    # if states is specified and cities isnt
-    if len(states) > 0:
-        cities_in_states = []
-        for sid in states:
-            from models.state import State
-            state = storage.get(State, sid)
-            for city_in_state in state.cities:
-                cities_in_states.append(city_in_state)
-        places_in_city = []
-        for city_in_state in cities_in_states:
-            for place in city_in_state.places:
-                list_of_places.append(place)
-                # places_in_city.append(place)
-
-        # for place in places_in_city:
-            # list_of_places.append(place)
-
-    # if cities is specified and states isnt
-    if len(cities) > 0:
-        places_in_cities = []
-        for cid in cities:
-            from models.city import City
-            city = storage.get(City, cid)
-            for place_in_city in city.places:
-                places_in_cities.append(place_in_city)
-
-        for place in places_in_cities:
-            list_of_places.append(place)
-
-    # if amenities is specified
-    if len(amenities) > 0:
-        amenity_list = []
-        filtered_places = []
-        if not list_of_places:
-            from models.place import Place
-            list_of_places = storage.all(Place).values()
-        for aid in amenities:
-            from models.amenity import Amenity
-            amenity_list.append(storage.get(Amenity, aid))
-
-        for place in list_of_places:
-            amenities_present = True
-            for amenity in amenity_list:
-                if amenity not in place.amenities:
-                    amenities_present = False
-                    break
-            if amenities_present:
-                filtered_places.append(place)
-        list_of_places = filtered_places
+    # a single query in DB mode, index lookups in file mode
+    list_of_places = storage.search_places(states, cities, amenities)
 
     places = []
     for place in list_of_places:
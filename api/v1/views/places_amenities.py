@@ -21,7 +21,7 @@ def place_all_amenities(place_id):
         The list of all Amenity objects of a Place.
     """
     from models.place import Place
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, load={"amenities": "joined"})
 
     if place is None:
         abort(404)
@@ -4,6 +4,7 @@ Create a new view for Review objects that handles all default RESTFul
 API actions.
 """
 from api.v1.views import app_views
+from api.v1.views.paging import paginate
 from flask import jsonify, abort, request
 from models import storage
 
@@ -12,16 +13,17 @@ from models import storage
                  strict_slashes=False)
 def all_reviews(place_id):
     """
-    Retrieves the list of all Review objects of a Place.
+    Retrieves the list of all Review objects of a Place, or a page of them.
     """
     from models.place import Place
+    from models.review import Review
     place = storage.get(Place, place_id)
 
     if place is None:
         abort(404)
 
-    reviews = [review.to_dict() for review in place.reviews]
-    return jsonify(reviews)
+    return paginate(lambda limit, after:
+                    storage.filter(Review, limit, after, place_id=place.id))
 
 
 @app_views.route("/reviews/<path:review_id>", methods=["GET"],
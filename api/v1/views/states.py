@@ -4,6 +4,7 @@ Create a new view for State objects that handles all default RESTFul
 API actions.
 """
 from api.v1.views import app_views
+from api.v1.views.paging import paginate
 from flask import jsonify, abort, request
 from models import storage
 
@@ -11,10 +12,10 @@ from models import storage
 @app_views.route("/states", methods=["GET"], strict_slashes=False)
 def all_states():
     """
-    Retrieves the list of all State objects
+    Retrieves the list of all State objects, or a page of them
     """
-    states = [state.to_dict() for state in storage.all("State").values()]
-    return jsonify(states)
+    return paginate(lambda limit, after:
+                    storage.all("State", limit, after).values())
 
 
 @app_views.route("/states/<path:state_id>", methods=["GET"],
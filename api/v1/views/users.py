@@ -4,6 +4,7 @@ Create a new view for User objects that handles all default RESTFul
 API actions.
 """
 from api.v1.views import app_views
+from api.v1.views.paging import paginate
 from flask import jsonify, abort, request
 from models import storage
 
@@ -11,11 +12,10 @@ from models import storage
 @app_views.route("/users", methods=["GET"], strict_slashes=False)
 def all_users():
     """
-    Retrieves the list of all User objects.
+    Retrieves the list of all User objects, or a page of them.
     """
-    users = [user.to_dict()
-             for user in storage.all("User").values()]
-    return jsonify(users)
+    return paginate(lambda limit, after:
+                    storage.all("User", limit, after).values())
 
 
 @app_views.route("/users/<path:user_id>", methods=["GET"],
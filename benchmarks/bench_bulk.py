@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Benchmarks seeding places: one save() per object, as BaseModel.save()
+does, against bulk_new() and a single bulk_save()
+
+Runs against the storage the HBNB_* variables select, FileStorage in a
+scratch directory by default. With HBNB_TYPE_STORAGE=db the tables of the
+database are dropped first (HBNB_ENV=test): use a scratch database.
+
+Usage: ./benchmarks/bench_bulk.py [size ...]   (default: 1k 10k 100k)
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+os.environ["HBNB_ENV"] = "test"
+
+from models import storage  # noqa: E402
+from models.city import City  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.state import State  # noqa: E402
+from models.user import User  # noqa: E402
+
+# objects saved one by one, extrapolated to the sizes
+SAMPLE = 200
+
+
+def parents():
+    """saves the state, city and user the places belong to"""
+    state = State(name="state")
+    city = City(state_id=state.id, name="city")
+    user = User(email="user@hbnb.io", password="pwd")
+    for obj in (state, city, user):
+        storage.new(obj)
+    storage.save()
+    return city, user
+
+
+def places(size, city, user):
+    """returns size new places"""
+    return [Place(city_id=city.id, user_id=user.id, name="place",
+                  price_by_night=i % 500) for i in range(size)]
+
+
+def main(sizes):
+    """runs the benchmark for every size"""
+    storage.reload()
+    city, user = parents()
+    start = time.perf_counter()
+    for place in places(SAMPLE, city, user):
+        place.save()
+    one_by_one = (time.perf_counter() - start) / SAMPLE
+    print("{:>9} {:>16} {:>12}".format("places", "save() each (s)",
+                                       "bulk (s)"))
+    for size in sizes:
+        objs = places(size, city, user)
+        start = time.perf_counter()
+        storage.bulk_new(objs)
+        storage.bulk_save()
+        bulk = time.perf_counter() - start
+        # each save() costs more as the storage grows: a lower bound
+        print("{:>9} {:>15.1f}+ {:>12.2f}".format(size, one_by_one * size,
+                                                  bulk))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Benchmarks GET /api/v1/stats latency against DBStorage: the COUNT(*) of
+every table in one query, against loading every row to count it as
+count() used to
+
+Runs against the MySQL database of the HBNB_MYSQL_* variables, whose
+tables are dropped first (HBNB_ENV=test): use a scratch database.
+
+Usage: ./benchmarks/bench_db_stats.py [size ...]   (default: 1k 10k 100k)
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["HBNB_TYPE_STORAGE"] = "db"
+os.environ["HBNB_ENV"] = "test"
+
+from api.v1.app import app  # noqa: E402
+from models import storage  # noqa: E402
+from models.amenity import Amenity  # noqa: E402
+from models.city import City  # noqa: E402
+from models.engine.db_storage import classes  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.state import State  # noqa: E402
+from models.user import User  # noqa: E402
+
+REQUESTS = 50
+BATCH = 5000
+
+
+def populate(size):
+    """adds rows spread over the six tables until there are size rows"""
+    state = State(name="state")
+    user = User(email="user@hbnb.io", password="pwd")
+    city = City(state_id=state.id, name="city")
+    place = Place(city_id=city.id, user_id=user.id, name="place")
+    for obj in (state, user, city, place):
+        storage.new(obj)
+    storage.save()
+    makers = [lambda: Amenity(name="amenity"),
+              lambda: City(state_id=state.id, name="city"),
+              lambda: Place(city_id=city.id, user_id=user.id, name="place"),
+              lambda: Review(place_id=place.id, user_id=user.id,
+                             text="great"),
+              lambda: State(name="state"),
+              lambda: User(email="user@hbnb.io", password="pwd")]
+    for i in range(storage.count(), size):
+        storage.new(makers[i % len(makers)]())
+        if i % BATCH == 0:
+            storage.save()
+    storage.save()
+
+
+def load_count():
+    """the former count(): load the rows of every table to count them"""
+    return {name: len(storage.all(cls)) for name, cls in classes.items()}
+
+
+def main(sizes):
+    """runs the benchmark for every size"""
+    storage.reload()
+    client = app.test_client()
+    print("{:>9} {:>14} {:>14}".format("rows", "/stats (ms)", "load (ms)"))
+    for size in sizes:
+        populate(size)
+        stats = timeit.timeit(lambda: client.get("/api/v1/stats"),
+                              number=REQUESTS) / REQUESTS
+        load = timeit.timeit(load_count, number=3) / 3
+        print("{:>9} {:>14.3f} {:>14.3f}".format(size, stats * 1000,
+                                                 load * 1000))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
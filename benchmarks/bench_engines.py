@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Benchmarks FileStorage against SQLiteStorage: seeding places in bulk,
+startup (import models, which reloads the storage), get() by id, filter()
+on an attribute and count(), each engine in a fresh process in a scratch
+directory
+
+Usage: ./benchmarks/bench_engines.py [size ...]   (default: 1k 10k 100k)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = {
+    "file": {},
+    "sqlite": {"HBNB_TYPE_STORAGE": "sqlite"},
+}
+SEED = """
+import sys
+from models import storage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+state = State(name="state")
+city = City(state_id=state.id, name="city")
+user = User(email="user@hbnb.io", password="pwd")
+storage.bulk_new([state, city, user])
+storage.bulk_new([Place(city_id=city.id, user_id=user.id, name="place",
+                        price_by_night=i % 500)
+                  for i in range(int(sys.argv[1]))])
+storage.bulk_save()
+"""
+PROBE = """
+import time, timeit
+start = time.perf_counter()
+import models
+from models.place import Place
+models.storage.count()
+startup = time.perf_counter() - start
+ids = [place.id for place in models.storage.filter(Place, limit=100)]
+get = timeit.timeit(lambda: [models.storage.get(Place, id) for id in ids],
+                    number=3) / 300
+filter = timeit.timeit(lambda: models.storage.filter(Place,
+                                                     price_by_night=42),
+                       number=10) / 10
+count = timeit.timeit(lambda: models.storage.count(Place), number=10) / 10
+print(startup, get, filter, count)
+"""
+
+
+def run(script, directory, engine, *args):
+    """runs script with engine in a fresh process, returns its output"""
+    env = dict(os.environ, PYTHONPATH=ROOT,
+               HBNB_SQLITE_PATH=os.path.join(directory, "hbnb.db"))
+    env.pop("HBNB_ENV", None)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    env.update(ENGINES[engine])
+    return subprocess.check_output([sys.executable, "-c", script] +
+                                   list(args), cwd=directory, env=env)
+
+
+def main(sizes):
+    """runs the benchmark for every size and engine"""
+    print("{:>9} {:>7} {:>9} {:>12} {:>10} {:>11} {:>10}".format(
+        "places", "engine", "seed (s)", "startup (s)", "get (ms)",
+        "filter (ms)", "count (ms)"))
+    for size in sizes:
+        for engine in ENGINES:
+            directory = tempfile.mkdtemp()
+            seed = run("import time; start = time.perf_counter()\n" + SEED +
+                       "print(time.perf_counter() - start)", directory, engine,
+                       str(size))
+            startup, get, filter, count = map(
+                float, run(PROBE, directory, engine).split())
+            print("{:>9} {:>7} {:>9.2f} {:>12.3f} {:>10.3f} {:>11.3f} "
+                  "{:>10.3f}".format(size, engine, float(seed), startup,
+                                     get * 1000, filter * 1000,
+                                     count * 1000))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Benchmarks the FileStorage snapshot serializers: save time, load time
+(decoding and building the objects, as reload does) and file size of the
+JSON and binary formats
+
+Usage: ./benchmarks/bench_formats.py [size ...]   (default: 10k 100k 1M)
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+os.environ.pop("HBNB_TYPE_STORAGE", None)
+
+from models.engine.file_storage import classes  # noqa: E402
+from models.engine.serializers import serializers  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def snapshot(size):
+    """returns the to_dict() of size places, reviews and users"""
+    json_objects = {}
+    for i in range(size):
+        if i % 3 == 0:
+            obj = Place(city_id=str(i), user_id=str(i), name="place",
+                        number_rooms=i % 7, price_by_night=i % 500,
+                        latitude=37.77, longitude=-122.41)
+        elif i % 3 == 1:
+            obj = Review(place_id=str(i), user_id=str(i), text="great")
+        else:
+            obj = User(email="user{}@hbnb.io".format(i), password="pwd")
+        json_objects[obj.__class__.__name__ + "." + obj.id] = obj.to_dict()
+    return json_objects
+
+
+def main(sizes):
+    """runs the benchmark for every size and format"""
+    print("{:>9} {:>7} {:>9} {:>9} {:>10}".format("objects", "format",
+                                                  "save (s)", "load (s)",
+                                                  "size (MiB)"))
+    for size in sizes:
+        json_objects = snapshot(size)
+        for name, serializer in serializers.items():
+            path = "snapshot" + serializer.extension
+            start = time.perf_counter()
+            with open(path, "w" + serializer.mode) as f:
+                serializer.dump(json_objects, f)
+            saved = time.perf_counter() - start
+            start = time.perf_counter()
+            with open(path, "r" + serializer.mode) as f:
+                objects = {key: classes[attrs["__class__"]](**attrs)
+                           for key, attrs in serializer.iterload(f)}
+            loaded = time.perf_counter() - start
+            print("{:>9} {:>7} {:>9.3f} {:>9.3f} {:>10.1f}".format(
+                size, name, saved, loaded, os.path.getsize(path) / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Benchmarks the FileStorage attribute indexes: lookups through the hash and
+sorted indexes the models declare against a scan of the class, and the
+cost of keeping the indexes up to date
+
+Usage: ./benchmarks/bench_indexes.py [places]   (default: 1M)
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+os.environ.pop("HBNB_TYPE_STORAGE", None)
+
+from models.engine.criteria import matches, parse  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def timed(function, repeat=5):
+    """returns the result of function and its best time in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main(size):
+    """runs the benchmark on size places and size / 10 users"""
+    storage = FileStorage()
+    start = time.perf_counter()
+    for i in range(size):
+        storage.new(Place(name="place", price_by_night=i % 500,
+                          max_guest=i % 12, number_rooms=i % 7))
+    for i in range(size // 10):
+        storage.new(User(email="user{}@hbnb.io".format(i)))
+    print("{} places, {} users added in {:.1f} s".format(
+        size, size // 10, time.perf_counter() - start))
+
+    queries = [
+        (User, {"email": "user{}@hbnb.io".format(size // 20)}),
+        (Place, {"price_by_night__gte": 495}),
+        (Place, {"price_by_night__gte": 100, "price_by_night__lt": 105}),
+        (Place, {"max_guest": 3, "number_rooms": 2}),
+        (Place, {"number_rooms__in": [0, 6], "price_by_night__lt": 10}),
+    ]
+    print("{:<50} {:>9} {:>11} {:>9} {:>9}".format(
+        "query", "matches", "first (ms)", "index", "scan"))
+    for cls, criteria in queries:
+        result, first = timed(lambda: storage.filter(cls, **criteria), 1)
+        _, indexed = timed(lambda: storage.filter(cls, **criteria))
+        conditions = parse(criteria)
+        _, scan = timed(lambda: [obj for obj in storage.all(cls).values()
+                                 if matches(obj, conditions)])
+        print("{:<50} {:>9} {:>11.1f} {:>9.2f} {:>9.1f}".format(
+            "{}: {}".format(cls.__name__, criteria)[:50], len(result),
+            first, indexed, scan))
+
+    places = storage.filter(Place, price_by_night__lt=2)[:1000]
+    start = time.perf_counter()
+    for place in places:
+        place.price_by_night += 250
+        storage.new(place)
+    print("{} indexed updates in {:.1f} ms".format(
+        len(places), (time.perf_counter() - start) * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+Benchmarks FileStorage startup: time to import models (which reloads
+file.json) and the peak RSS of the process, for each storage mode
+
+Usage: ./benchmarks/bench_reload.py [size ...]   (default: 10k 100k 1M)
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "eager": {},
+    "lazy": {"HBNB_FILE_LAZY": "1"},
+    "mapped": {"HBNB_FILE_FORMAT": "indexed"},
+}
+PROBE = """
+import resource, time
+start = time.perf_counter()
+import models
+models.storage.count()
+print(time.perf_counter() - start,
+      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+CONVERT = """
+import json, sys
+from models.engine.serializers import serializers
+serializer = serializers[sys.argv[1]]
+with open("../file.json") as f:
+    json_objects = json.load(f)
+with open("file.json", "w" + serializer.mode) as f:
+    serializer.dump(json_objects, f)
+"""
+
+
+def write_file(path, size):
+    """writes a file.json holding size places"""
+    stamp = "2023-10-31T04:26:16.994082"
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(size):
+            obj_id = str(uuid.uuid4())
+            obj = {"id": obj_id, "created_at": stamp, "updated_at": stamp,
+                   "city_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()),
+                   "name": "place {}".format(i), "number_rooms": i % 7,
+                   "price_by_night": i % 500, "__class__": "Place"}
+            f.write("{}{}: {}".format(", " if i else "",
+                                      json.dumps("Place." + obj_id),
+                                      json.dumps(obj)))
+        f.write("}")
+
+
+def convert(directory, file_format):
+    """
+    writes the file.json of directory in another format to a subdirectory
+    named after it, and returns the subdirectory
+    """
+    subdirectory = os.path.join(directory, file_format)
+    os.mkdir(subdirectory)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    subprocess.check_call([sys.executable, "-c", CONVERT, file_format],
+                          cwd=subdirectory, env=env)
+    return subdirectory
+
+
+def probe(directory, env):
+    """imports models in a fresh process, returns (seconds, peak RSS KiB)"""
+    env = dict(os.environ, PYTHONPATH=ROOT, **env)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    out = subprocess.check_output([sys.executable, "-c", PROBE],
+                                  cwd=directory, env=env)
+    seconds, rss = out.split()
+    return float(seconds), int(rss)
+
+
+def main(sizes, modes=MODES):
+    """runs the benchmark for every size and mode"""
+    print("{:>9} {:>10} {:>12} {:>14}".format("objects", "mode",
+                                              "startup (s)", "peak RSS (MiB)"))
+    for size in sizes:
+        directory = tempfile.mkdtemp()
+        write_file(os.path.join(directory, "file.json"), size)
+        for mode, env in modes.items():
+            if "HBNB_FILE_FORMAT" in env:
+                seconds, rss = probe(convert(directory,
+                                             env["HBNB_FILE_FORMAT"]), env)
+            else:
+                seconds, rss = probe(directory, env)
+            print("{:>9} {:>10} {:>12.3f} {:>14.1f}".format(
+                size, mode, seconds, rss / 1024))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
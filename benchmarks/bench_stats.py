@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Benchmarks GET /api/v1/stats latency against FileStorage
+
+Usage: ./benchmarks/bench_stats.py [size ...]   (default: 10k 100k 1M)
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+os.environ.pop("HBNB_TYPE_STORAGE", None)
+
+from api.v1.app import app  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import classes  # noqa: E402
+
+NAMES = ["Amenity", "City", "Place", "Review", "State", "User"]
+REQUESTS = 200
+
+
+def populate(size):
+    """fills storage with size objects spread over the API classes"""
+    storage._FileStorage__objects = {}
+    for i in range(size):
+        storage.new(classes[NAMES[i % len(NAMES)]]())
+
+
+def scan_count(cls):
+    """the pre-index count(): filter every stored object by class"""
+    return len([obj for obj in storage.all().values()
+                if obj.__class__.__name__ == cls])
+
+
+def main(sizes):
+    """runs the benchmark for every size"""
+    client = app.test_client()
+    print("{:>9} {:>14} {:>14}".format("objects", "/stats (ms)",
+                                       "scan (ms)"))
+    for size in sizes:
+        populate(size)
+        stats = timeit.timeit(lambda: client.get("/api/v1/stats"),
+                              number=REQUESTS) / REQUESTS
+        scan = timeit.timeit(lambda: [scan_count(n) for n in NAMES],
+                             number=3) / 3
+        print("{:>9} {:>14.3f} {:>14.3f}".format(size, stats * 1000,
+                                                 scan * 1000))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Benchmarks loading file.json with json.load against the streaming loader
+used by FileStorage.reload(): load time and peak RSS of the process
+
+Usage: ./benchmarks/bench_stream.py [size ...]   (default: 10k 100k 1M)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_reload import ROOT, write_file
+
+LOADERS = {
+    "json.load": """
+import json
+from models.engine.file_storage import classes
+with open("data.json") as f:
+    jo = json.load(f)
+objs = {key: classes[jo[key]["__class__"]](**jo[key]) for key in jo}
+""",
+    "iterload": """
+from models.engine.file_storage import classes
+from models.engine.json_stream import iterload
+with open("data.json") as f:
+    objs = {key: classes[attrs["__class__"]](**attrs)
+            for key, attrs in iterload(f)}
+""",
+}
+PROBE = """
+import resource, time
+import models
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start,
+      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def probe(directory, loader):
+    """runs loader in a fresh process, returns (seconds, peak RSS KiB)"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    out = subprocess.check_output([sys.executable, "-c",
+                                   PROBE.format(loader)],
+                                  cwd=directory, env=env)
+    seconds, rss = out.split()
+    return float(seconds), int(rss)
+
+
+def main(sizes):
+    """runs the benchmark for every size and loader"""
+    print("{:>9} {:>10} {:>10} {:>14}".format("objects", "loader",
+                                              "load (s)", "peak RSS (MiB)"))
+    for size in sizes:
+        directory = tempfile.mkdtemp()
+        # not file.json: importing models must not load it
+        write_file(os.path.join(directory, "data.json"), size)
+        for name, loader in LOADERS.items():
+            seconds, rss = probe(directory, loader)
+            print("{:>9} {:>10} {:>10.3f} {:>14.1f}".format(
+                size, name, seconds, rss / 1024))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
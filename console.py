@@ -108,18 +108,17 @@ class HBNBCommand(cmd.Cmd):
     def do_all(self, arg):
         """Prints string representations of instances"""
         args = shlex.split(arg)
-        obj_list = []
         if len(args) == 0:
-            obj_dict = models.storage.all()
+            objs = models.storage.iter_all()
         elif args[0] in classes:
-            obj_dict = models.storage.all(classes[args[0]])
+            objs = models.storage.iter_all(classes[args[0]])
         else:
             print("** class doesn't exist **")
             return False
-        for key in obj_dict:
-            obj_list.append(str(obj_dict[key]))
+        # printed as they come rather than joined, for large storages
         print("[", end="")
-        print(", ".join(obj_list), end="")
+        for i, obj in enumerate(objs):
+            print(", " if i else "", obj, sep="", end="")
         print("]")
 
     def do_update(self, arg):
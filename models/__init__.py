@@ -8,10 +8,21 @@ from os import getenv
 
 storage_t = getenv("HBNB_TYPE_STORAGE")
 
-if storage_t == "db":
+if storage_t == "sqlite":
+    # the models of the db storage, in a SQLite file
+    storage_t = "db"
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+elif storage_t == "db":
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
-storage.reload()
+
+if storage_t == "db":
+    storage.reload()
+else:
+    # the class files of the sharded layout are decoded by a process pool
+    # at startup only
+    storage.reload(parallel=True)
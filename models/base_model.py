@@ -7,8 +7,8 @@ from datetime import datetime
 import models
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, DateTime
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.ext.declarative import declarative_base, declared_attr
 import uuid
 # import hashlib
 
@@ -25,7 +25,16 @@ class BaseModel:
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
         created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+        @declared_attr
+        def __table_args__(cls):
+            """
+            indexes (created_at, id), the order of the pages of all(), which
+            also serves the filters and sorts on created_at alone
+            """
+            return (Index("ix_{}_created_at_id".format(cls.__tablename__),
+                          "created_at", "id"),)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -36,11 +45,11 @@ class BaseModel:
 
             if kwargs.get("created_at", None) and type(self.created_at) is str:
                 self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+            elif type(kwargs.get("created_at", None)) is not datetime:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
                 self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+            elif type(kwargs.get("updated_at", None)) is not datetime:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""
+Contains the parsing of the criteria the storage engines filter with
+"""
+
+import operator
+
+# dictionary - criterion suffix -> function comparing an attribute value,
+# or a column, with the criterion value; "in" is handled by the engines
+operators = {"eq": operator.eq, "ne": operator.ne, "lt": operator.lt,
+             "lte": operator.le, "gt": operator.gt, "gte": operator.ge,
+             "in": None}
+
+
+def parse(criteria):
+    """
+    Returns the (attribute, operator, value) conditions of criteria
+
+    Args:
+        criteria (dict): attribute=value for equality, or
+            attribute__<operator>=value with operator one of ne, lt, lte,
+            gt, gte and in (value: iterable of values)
+
+    Raises:
+        ValueError: for an unknown operator
+    """
+    conditions = []
+    for key, value in criteria.items():
+        attr, op = key.rsplit("__", 1) if "__" in key else (key, "eq")
+        if op not in operators:
+            raise ValueError("Unknown operator {!r} in {!r}".format(op, key))
+        if op == "in":
+            value = list(value)
+        conditions.append((attr, op, value))
+    return conditions
+
+
+def matches(obj, conditions):
+    """checks that obj satisfies every condition returned by parse()"""
+    for attr, op, value in conditions:
+        actual = getattr(obj, attr, None)
+        if op == "in":
+            if actual not in value:
+                return False
+            continue
+        try:
+            if not operators[op](actual, value):
+                return False
+        except TypeError:
+            # e.g. None compared with a number
+            return False
+    return True
@@ -7,51 +7,230 @@ import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine import pagination
+from models.engine.criteria import operators, parse
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, distinct, event, func, literal
+from sqlalchemy import or_, select, union_all
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.orm import Session, joinedload, scoped_session
+from sqlalchemy.orm import selectinload, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from itertools import cycle
 import shlex
+import threading
+from time import monotonic
 
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# eager loading strategies of the load argument of the read methods
+loaders = {"selectin": selectinload, "joined": joinedload}
+# dialects whose INSERT can update the rows with the same primary key
+upserts = {"mysql": mysql.insert, "postgresql": postgresql.insert,
+           "sqlite": sqlite.insert}
+
+
+class MeteredPool(QueuePool):
+    """a QueuePool timing how long checkouts wait for a connection"""
+    def __init__(self, *args, **kwargs):
+        """Instantiate a MeteredPool object"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__counters = {"checkouts": 0, "checkout_timeouts": 0,
+                           "checkout_wait_total": 0.0,
+                           "checkout_wait_max": 0.0}
+
+    def _do_get(self):
+        """checks a connection out, recording the time waited for it"""
+        start = monotonic()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            with self.__lock:
+                self.__counters["checkout_timeouts"] += 1
+            raise
+        finally:
+            wait = monotonic() - start
+            with self.__lock:
+                counters = self.__counters
+                counters["checkouts"] += 1
+                counters["checkout_wait_total"] += wait
+                counters["checkout_wait_max"] = max(
+                    counters["checkout_wait_max"], wait)
+
+    def stats(self):
+        """returns the checkout counters and the connections in use"""
+        with self.__lock:
+            stats = dict(self.__counters)
+        stats.update(size=self.size(), checked_out=self.checkedout(),
+                     checked_in=self.checkedin(), overflow=self.overflow())
+        return stats
+
+
+class RoutingSession(Session):
+    """
+    a Session reading from a read replica and writing to the primary
+
+    The session reads from one replica, taken in turn from replicas when
+    it first reads. Once it writes (flushes, or runs an INSERT, UPDATE or
+    DELETE), it reads from the primary too until it is closed, so that it
+    sees its own writes before they reach the replicas.
+    """
+    def __init__(self, replicas=None, **kwargs):
+        """
+        Instantiate a RoutingSession object
+
+        Args:
+            replicas (iterator, optional): yields the engine of the next
+                replica, e.g. an itertools.cycle; None reads from the
+                primary
+            **kwargs: arguments of Session, whose bind is the primary
+        """
+        super().__init__(**kwargs)
+        self.__replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """returns the engine a statement or a flush is run on"""
+        if self.__replicas is not None and not self.info.get("primary"):
+            if not self._flushing and not isinstance(clause, UpdateBase):
+                if "replica" not in self.info:
+                    self.info["replica"] = next(self.__replicas)
+                return self.info["replica"]
+            self.info["primary"] = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
 
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
+    __replicas = []
     __session = None
+    # queries - number of statements the thread executed since its reset
+    __local = threading.local()
 
     def __init__(self):
-        """Instantiate a DBStorage object"""
-        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
-        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
-        HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
-        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
+        """
+        Instantiate a DBStorage object
+
+        The connection pool is configured by HBNB_MYSQL_POOL_SIZE (default
+        5), HBNB_MYSQL_MAX_OVERFLOW (10), HBNB_MYSQL_POOL_TIMEOUT (seconds
+        a checkout waits, 30), HBNB_MYSQL_POOL_RECYCLE (seconds after
+        which a connection is replaced, 3600, below MySQL's wait_timeout)
+        and HBNB_MYSQL_POOL_PRE_PING (1 to test connections on checkout,
+        the default, 0 not to). HBNB_DB_URL replaces the MySQL database
+        with any other server or file database, e.g. SQLite in tests.
+
+        HBNB_MYSQL_REPLICA_HOSTS, a comma-separated list of hosts
+        replicating HBNB_MYSQL_DB, moves the reads to the replicas, see
+        RoutingSession; writes still go to HBNB_MYSQL_HOST, the primary.
+        HBNB_DB_REPLICA_URLS, a comma-separated list of URLs, replaces
+        them as HBNB_DB_URL does the primary. Each replica has a pool of
+        its own, configured as the primary's.
+        """
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        self.__engine = self._create_engine()
+        self.__replicas = self._create_replicas()
+        for engine in [self.__engine] + self.__replicas:
+            event.listen(engine, "before_cursor_execute", self._count_query)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def _create_engine(self):
+        """returns the engine of the MySQL database, see __init__()"""
+        url = getenv('HBNB_DB_URL') or self._url(getenv('HBNB_MYSQL_HOST'))
+        return self._pooled_engine(url)
+
+    def _create_replicas(self):
+        """returns the engines of the read replicas, see __init__()"""
+        urls = getenv('HBNB_DB_REPLICA_URLS')
+        if urls:
+            urls = [url.strip() for url in urls.split(',') if url.strip()]
+        else:
+            hosts = getenv('HBNB_MYSQL_REPLICA_HOSTS', '').split(',')
+            urls = [self._url(host.strip()) for host in hosts
+                    if host.strip()]
+        return [self._pooled_engine(url) for url in urls]
+
+    @staticmethod
+    def _url(host):
+        """returns the URL of the MySQL database on host"""
+        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
+        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
+        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
+        return 'mysql+mysqldb://{}:{}@{}/{}'.format(
+            HBNB_MYSQL_USER, HBNB_MYSQL_PWD, host, HBNB_MYSQL_DB)
+
+    @staticmethod
+    def _pooled_engine(url):
+        """returns the engine of url with the pool of __init__()"""
+        return create_engine(
+            url, poolclass=MeteredPool,
+            pool_size=int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+            max_overflow=int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+            pool_timeout=float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+            pool_recycle=int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            pool_pre_ping=getenv('HBNB_MYSQL_POOL_PRE_PING', '1') == '1')
+
+    def all(self, cls=None, limit=None, after=None, load=None):
+        """
+        query on the current database session
+
+        With limit or after, returns a page of the objects instead, in
+        (created_at, id) order, read through the (created_at, id) index.
+
+        Args:
+            cls (object, optional): Class or class name
+            limit (int, optional): maximum number of objects of the page
+            after (string, optional): cursor of the object the page starts
+                after, see models.engine.pagination
+            load (optional): relationships of cls to eager load, see
+                _options()
+        """
+        if limit is not None or after is not None:
+            objs = []
+            for clss in classes:
+                if cls is None or cls is classes[clss] or cls is clss:
+                    query = self.__session.query(classes[clss]).options(
+                        *self._options(classes[clss], load))
+                    objs.extend(self._page(query, classes[clss], limit,
+                                           after))
+            # the pages of several classes are merged
+            objs.sort(key=lambda obj: (obj.created_at, obj.id))
+            return {obj.__class__.__name__ + '.' + obj.id: obj
+                    for obj in objs[:limit]}
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                objs = self.__session.query(classes[clss]).options(
+                    *self._options(classes[clss], load)).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def iter_all(self, cls=None, batch_size=1000):
+        """
+        yields the objects of cls (default: all classes) one by one,
+        streaming the rows with a server-side cursor and building the
+        objects batch_size rows at a time, so that memory does not grow
+        with the size of the tables
+
+        Args:
+            cls (object, optional): Class or class name
+            batch_size (int, optional): number of rows fetched at once
+        """
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls is clss:
+                query = self.__session.query(classes[clss])
+                yield from query.yield_per(batch_size)
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
@@ -60,6 +239,71 @@ class DBStorage:
         """commit all changes of the current database session"""
         self.__session.commit()
 
+    def bulk_new(self, objs, upsert=False):
+        """
+        adds the rows of objs to the ones bulk_save() inserts
+
+        The rows are taken from the objects as they are now, without their
+        relationships, and the objects are not added to the session.
+
+        Args:
+            objs (iterable): objects to insert
+            upsert (bool, optional): replace the rows with the same id
+                rather than fail on them, so that imports can be re-run
+        """
+        pending = self.__session.info.setdefault("bulk", {})
+        for obj in objs:
+            if obj is None:
+                continue
+            table = obj.__table__
+            row = {}
+            for column in table.columns:
+                value = getattr(obj, column.name, None)
+                if value is None and column.default is not None:
+                    # applied by the session to the objects it adds
+                    value = column.default.arg if column.default.is_scalar \
+                        else column.default.arg(None)
+                row[column.name] = value
+            pending.setdefault((table, upsert), []).append(row)
+
+    def bulk_save(self, batch_size=1000):
+        """
+        inserts the rows passed to bulk_new() with one multi-row INSERT
+        (executemany) and one commit every batch_size rows, parent tables
+        first
+
+        Args:
+            batch_size (int, optional): number of rows per commit
+        """
+        pending = self.__session.info.pop("bulk", {})
+        for table in Base.metadata.sorted_tables:
+            for upsert in (False, True):
+                rows = pending.get((table, upsert), [])
+                for start in range(0, len(rows), batch_size):
+                    self.__session.execute(self._insert(table, upsert),
+                                           rows[start:start + batch_size])
+                    self.__session.commit()
+
+    def _insert(self, table, upsert):
+        """
+        returns the INSERT of the rows of table, updating the rows with the
+        same primary key when upsert
+        """
+        if not upsert:
+            return table.insert()
+        dialect = self.__engine.dialect.name
+        if dialect not in upserts:
+            raise ValueError("No upsert for the {} dialect".format(dialect))
+        insert = upserts[dialect](table)
+        if dialect == "mysql":
+            return insert.on_duplicate_key_update(
+                {column.name: insert.inserted[column.name]
+                 for column in table.columns if not column.primary_key})
+        return insert.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={column.name: insert.excluded[column.name]
+                  for column in table.columns if not column.primary_key})
+
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
@@ -68,7 +312,10 @@ class DBStorage:
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        # the replicas get the tables from the primary
+        replicas = cycle(self.__replicas) if self.__replicas else None
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession, replicas=replicas)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -76,27 +323,203 @@ class DBStorage:
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
+    def stats(self):
+        """
+        Returns the connection pool metrics: its size, the connections
+        checked out, checked in and opened past the size (overflow), the
+        number of checkouts, those that timed out, and the total and
+        longest time in seconds checkouts waited for a connection
+        """
+        return self.__engine.pool.stats()
+
+    def get(self, cls, id, load=None):
         """
         Gets and returns the object based on the class and its ID
 
         Args:
-            cls (object): Class
+            cls (object): Class or class name
             id (string): String representing the object ID
+            load (optional): relationships to eager load, see _options()
 
         Returns:
             The object based on the class and its ID, or None if not found
         """
-        # if cls in classes.values() and id and type(id) is str:
-        #     d_obj = self.all(cls)
-        #     for key, value in d_obj.items():
-        #         if key.split(".")[1] == id:
-        #             return value
         if cls:
-            obj = self.__session.query(cls).get(id)
+            cls = classes.get(cls, cls)
+            obj = self.__session.get(cls, id,
+                                     options=self._options(cls, load))
             return obj
         return None
 
+    def get_many(self, cls, ids, load=None):
+        """
+        Gets and returns the objects based on the class and their IDs
+        with a single IN query
+
+        Args:
+            cls (object): Class or class name
+            ids (iterable): Strings representing the object IDs
+            load (optional): relationships to eager load, see _options()
+
+        Returns:
+            The list of objects found, in the order of ids
+        """
+        ids = list(ids)
+        if not cls or not ids:
+            return []
+        cls = classes.get(cls, cls)
+        query = self.__session.query(cls).options(*self._options(cls, load))
+        found = {obj.id: obj for obj in query.filter(cls.id.in_(ids))}
+        return [found[id] for id in ids if id in found]
+
+    @staticmethod
+    def _options(cls, load):
+        """
+        returns the loader options eager loading relationships of cls, so
+        that walking them does not run one query per object
+
+        Args:
+            cls (class): the class queried
+            load (dict or iterable): relationship -> "selectin" (one IN
+                query per relationship) or "joined" (a JOIN in the query
+                itself), or relationships loaded with "selectin". A
+                relationship may be a dotted path, e.g. "cities.places".
+
+        Raises:
+            ValueError: for an unknown strategy
+        """
+        if not load:
+            return []
+        if not isinstance(load, dict):
+            load = dict.fromkeys(load, "selectin")
+        options = []
+        for path, strategy in load.items():
+            if strategy not in loaders:
+                raise ValueError("Unknown loading strategy {!r} for {!r}"
+                                 .format(strategy, path))
+            option, model = None, cls
+            for name in path.split("."):
+                attr = getattr(model, name)
+                option = loaders[strategy](attr) if option is None else \
+                    getattr(option, loaders[strategy].__name__)(attr)
+                model = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def _count_query(self, *args):
+        """counts a statement executed by the current thread"""
+        local = DBStorage.__local
+        local.queries = getattr(local, "queries", 0) + 1
+
+    def queries(self, reset=False):
+        """
+        Returns the number of SQL statements the current thread executed
+        since its last reset
+
+        Args:
+            reset (bool, optional): start counting again from 0
+        """
+        count = getattr(DBStorage.__local, "queries", 0)
+        if reset:
+            DBStorage.__local.queries = 0
+        return count
+
+    def filter(self, cls, limit=None, after=None, load=None, **criteria):
+        """
+        Returns the objects of a class matching every criterion, with the
+        criteria compiled to the WHERE clause of a single query
+
+        With limit or after, returns a page of the matching objects in
+        (created_at, id) order, as all() does.
+
+        Args:
+            cls (object): Class or class name
+            limit (int, optional): maximum number of objects
+            after (string, optional): cursor of the object the page starts
+                after, see models.engine.pagination
+            load (optional): relationships to eager load, see _options()
+            **criteria: attribute=value, or attribute__<operator>=value
+                with operator one of ne, lt, lte, gt, gte and in
+
+        Returns:
+            The list of matching objects
+        """
+        if limit is None and after is None:
+            return self._query(cls, criteria, load).all()
+        return self._page(self._query(cls, criteria, load),
+                          classes.get(cls, cls), limit, after)
+
+    def find_one(self, cls, load=None, **criteria):
+        """
+        Returns the first object of a class matching every criterion, or
+        None; see filter()
+        """
+        return self._query(cls, criteria, load).first()
+
+    def _query(self, cls, criteria, load=None):
+        """returns the query of the objects of cls matching the criteria"""
+        cls = classes.get(cls, cls)
+        clauses = []
+        for attr, op, value in parse(criteria):
+            column = getattr(cls, attr)
+            if op == "in":
+                clauses.append(column.in_(value))
+            else:
+                clauses.append(operators[op](column, value))
+        return self.__session.query(cls).options(
+            *self._options(cls, load)).filter(*clauses)
+
+    @staticmethod
+    def _page(query, cls, limit, after):
+        """
+        returns the page of the objects of query following the cursor
+        after, seeking (created_at, id) > cursor so that the index is used
+        """
+        query = query.order_by(cls.created_at, cls.id)
+        if after:
+            created_at, id = pagination.decode(after)
+            query = query.filter(or_(cls.created_at > created_at,
+                                     and_(cls.created_at == created_at,
+                                          cls.id > id)))
+        return query.limit(limit).all()
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """
+        Returns the places in the cities of states or in cities (default:
+        anywhere) having every amenity of amenities, with a single query:
+        a join of the cities, and the place_amenity rows of the amenities
+        grouped by place, keeping the places that have all of them
+
+        Args:
+            states (iterable, optional): State IDs
+            cities (iterable, optional): City IDs
+            amenities (iterable, optional): Amenity IDs
+
+        Returns:
+            The list of matching places, each place once
+        """
+        from models.place import place_amenity
+        states, cities, amenities = set(states), set(cities), set(amenities)
+        query = self.__session.query(Place)
+        if states or cities:
+            located = []
+            if states:
+                located.append(City.state_id.in_(states))
+            if cities:
+                located.append(Place.city_id.in_(cities))
+            # each place joins a single city, a city named both directly
+            # and through its state still gives one row per place
+            query = query.join(City, Place.city_id == City.id).filter(
+                or_(*located))
+        if amenities:
+            equipped = select(place_amenity.c.place_id).where(
+                place_amenity.c.amenity_id.in_(amenities)).group_by(
+                place_amenity.c.place_id).having(
+                func.count(distinct(place_amenity.c.amenity_id)) ==
+                len(amenities))
+            query = query.filter(Place.id.in_(equipped))
+        return query.all()
+
     def count(self, cls=None):
         """
         Returns the number of objects in storage matching the given class.
@@ -108,13 +531,25 @@ class DBStorage:
             The number of objects in storage matching the given class.
             If no class is passed, returns the count of all objects in storage.
         """
-        # count = self.all(cls)
-        # if cls in classes.values():
-        #     count = self.all(cls)
-        # return len(count)
         if cls:
-            # all_objs_dict = self.all(cls)
-            count = len(self.all(cls))
-        else:
-            count = len(self.all())
-        return count
+            cls = classes.get(cls, cls)
+            if cls not in classes.values():
+                return 0
+            return self.__session.query(func.count()).select_from(
+                cls).scalar()
+        return sum(self.counts().values())
+
+    def counts(self):
+        """
+        Returns the number of objects of every class, with the SELECT
+        COUNT(*) of every table joined by UNION ALL into a single query
+
+        Returns:
+            dict: class name -> number of objects
+        """
+        query = union_all(*(select(literal(name).label("name"),
+                                   func.count().label("count"))
+                            .select_from(cls)
+                            for name, cls in classes.items()))
+        return {name: count
+                for name, count in self.__session.execute(query)}
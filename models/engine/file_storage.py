@@ -3,19 +3,89 @@
 Contains the FileStorage class
 """
 
+from datetime import datetime
+import atexit
 import json
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, time
 from models.city import City
+from models.engine.criteria import matches, parse
+from models.engine.locks import FileLock, RWLock
+from models.engine import pagination
+from models.engine.serializers import MappedSnapshot, detect, serializers
+from models.engine.sorted_index import SortedIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import multiprocessing
+import os
 import shlex
+from shard_loader import read_shard
+import threading
+from time import monotonic
 
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# foreign key attributes indexed by value for the relationship getters
+relations = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+             "Review": ("place_id", "user_id")}
+# attributes indexed by value for equality lookups: the relations and the
+# attributes the models declare "hash" in their indexes
+hash_indexes = {name: relations.get(name, ()) +
+                tuple(attr for attr, kind in getattr(cls, "indexes",
+                                                     {}).items()
+                      if kind == "hash")
+                for name, cls in classes.items()}
+# attributes indexed in order for ranges: created_at, which orders the
+# pages of all(), and the ones the models declare "sorted" in their indexes
+sorted_indexes = {name: ("created_at",) +
+                  tuple(attr for attr, kind in getattr(cls, "indexes",
+                                                       {}).items()
+                        if kind == "sorted")
+                  for name, cls in classes.items()}
+# every indexed attribute of a class, hash indexes first
+indexed = {name: hash_indexes[name] + sorted_indexes[name]
+           for name in classes if hash_indexes[name] + sorted_indexes[name]}
+# shard bytes past which the sharded layout is decoded by a process pool
+parallel_load_min = 1 << 20
+
+
+def _hashable(value):
+    """returns True if value can be a key of the hash indexes"""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _family(value):
+    """
+    returns the name of the family of values comparable with value, which
+    shares a sorted index, or None for the values left out of them
+    """
+    if value is None or isinstance(value, bool) or not _hashable(value):
+        return None
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, datetime):
+        return "str"
+    return type(value).__name__
+
+
+def _sortable(value):
+    """
+    returns value as it is kept in the sorted indexes: datetimes are kept
+    as the strings the records of the files hold, which sort the same way
+    """
+    if isinstance(value, datetime):
+        # the format of time, much faster than strftime
+        return value.isoformat(timespec="microseconds")
+    return value
 
 
 class FileStorage:
@@ -25,74 +95,1261 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - <class name> -> {<class name>.id: attributes} of the
+    # objects loaded in lazy mode but not instantiated yet; the attributes
+    # read from JSON files are kept as their JSON text, and the ones of
+    # mapped records are the MappedSnapshot to decode them from
+    __raw = {}
+    # dictionary - <class name>.id -> attributes of the records reload()
+    # could not instantiate an object from, written back as they were read
+    __invalid = {}
+    # set - keys found in the files by the running reload, if any
+    __seen = None
+    # dictionary - path -> error of the storage files the last reload
+    # could not decode, which no write may replace
+    __unreadable = {}
+    # version stamp of the lock file when the storage was last read or
+    # written with the process lock
+    __version = None
+    # dictionary - <class name> -> {<class name>.id: obj}, mirrors __objects
+    __by_class = {}
+    # set - names of the classes in __by_attr and __attr_values, which
+    # reload() empties: a class is indexed again when first queried
+    __attr_indexed = set()
+    # dictionary - (<class name>, <attribute>) -> {value: {key: obj}}
+    # for the attributes listed in hash_indexes, obj is None while in __raw
+    __by_attr = {}
+    # dictionary - (<class name>, <attribute>, <family>) -> SortedIndex for
+    # the attributes listed in sorted_indexes, built when first queried
+    __sorted = {}
+    # dictionary - <class name>.id -> values of the attributes listed in
+    # indexed it is indexed under
+    __attr_values = {}
+    # the __objects dictionary __by_class and __by_attr were built from
+    __indexed = None
+    # True when __objects was changed without going through new()/delete(),
+    # so __dirty does not tell what has to be written
+    __all_dirty = False
+    # (inode, size, mtime) of the JSON file and its journals when they were
+    # last read or written
+    __file_sig = None
+    # dictionary - <class name>.id -> obj (None when deleted) not yet
+    # written to the journal
+    __dirty = {}
+    # thread folding the journal into a new snapshot, if any
+    __compactor = None
+    # number of save() calls not written yet in group commit mode
+    __pending = 0
+    # monotonic time of the last write
+    __flushed_at = float("-inf")
+    # timer flushing the pending saves at the end of the interval, if any
+    __flush_timer = None
+    # lock - held while writing to the JSON file or the journal
+    __flush_lock = threading.Lock()
+    # reader/writer lock - held to write by new(), delete() and reload(),
+    # and to read by the other methods and while a save takes its snapshot
+    __lock = RWLock()
+    # lock - held by readers while they instantiate lazy or mapped objects
+    # or rebuild the indexes
+    __index_lock = threading.RLock()
+    # dictionary - counters reported by stats()
+    __counters = {"reloads_performed": 0, "reloads_skipped": 0,
+                  "journal_appends": 0, "compactions": 0,
+                  "saves": 0, "writes": 0, "last_write_saves": 0,
+                  "max_write_saves": 0, "materialized": 0,
+                  "shards_written": 0, "mapped": 0, "parallel_loads": 0,
+                  "invalid": 0}
+
+    def __init__(self, journal=None, journal_max=None, group_commit=None,
+                 lazy=None, layout=None, file_format=None, process_lock=None):
+        """
+        Instantiate a FileStorage object
+
+        Args:
+            journal (bool, optional): append changes to a journal on save()
+                instead of rewriting the JSON file (HBNB_FILE_JOURNAL=1)
+            journal_max (int, optional): journal size in bytes past which it
+                is folded into the JSON file (HBNB_FILE_JOURNAL_MAX)
+            group_commit (float, optional): write at most once every
+                group_commit seconds, 0 to only write on close() and
+                flush() (HBNB_FILE_GROUP_COMMIT)
+            lazy (bool, optional): keep the records read by reload(), as
+                JSON text when read from JSON, and only instantiate objects
+                when they are returned (HBNB_FILE_LAZY=1)
+            layout (string, optional): "single" for one JSON file, or
+                "sharded" for one JSON file per class in the directory
+                <JSON file>.d (HBNB_FILE_LAYOUT)
+            file_format (string, optional): "json", "binary" or "indexed"
+                snapshots, by default the format whose extension the file
+                name ends with (HBNB_FILE_FORMAT). Indexed snapshots are
+                memory-mapped by reload() and their records are only
+                decoded when the objects are asked for. This is the
+                format written: reload() reads every file in the format
+                its magic bytes tell, and migrate() converts them.
+            process_lock (bool, optional): lock <JSON file>.lock with
+                fcntl while reading and writing, and merge the changes of
+                the other processes before writing (HBNB_FILE_LOCK=1)
+        """
+        if journal is None:
+            journal = os.getenv("HBNB_FILE_JOURNAL") == "1"
+        if journal_max is None:
+            journal_max = int(os.getenv("HBNB_FILE_JOURNAL_MAX", 4 << 20))
+        if group_commit is None and os.getenv("HBNB_FILE_GROUP_COMMIT"):
+            group_commit = float(os.getenv("HBNB_FILE_GROUP_COMMIT"))
+        self.__journal = journal
+        self.__journal_max = journal_max
+        self.__group_commit = group_commit
+        self.__lazy = lazy if lazy is not None else \
+            os.getenv("HBNB_FILE_LAZY") == "1"
+        self.__layout = layout or os.getenv("HBNB_FILE_LAYOUT", "single")
+        self.__format = file_format or os.getenv("HBNB_FILE_FORMAT")
+        self.__process_lock = process_lock if process_lock is not None \
+            else os.getenv("HBNB_FILE_LOCK") == "1"
+        if group_commit is not None:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def _class_name(cls):
+        """returns the class name for a class or a class name"""
+        if isinstance(cls, str):
+            return cls
+        return cls.__name__
+
+    def _index_is_current(self):
+        """checks that __by_class still mirrors __objects"""
+        objects = self.__objects
+        return FileStorage.__indexed is objects and \
+            sum(map(len, FileStorage.__by_class.values())) == len(objects)
+
+    def _class_index(self):
+        """
+        Returns the per-class index of __objects.
+
+        The indexes are rebuilt when __objects was replaced or modified
+        without going through new()/delete() (e.g. console's all().pop()).
+        """
+        if not self._index_is_current():
+            with FileStorage.__index_lock:
+                if not self._index_is_current():
+                    self._rebuild_indexes()
+        return FileStorage.__by_class
+
+    def _rebuild_indexes(self):
+        """rebuilds the class and attribute indexes from scratch"""
+        FileStorage.__by_class = {}
+        self._reset_attr_indexes()
+        if FileStorage.__indexed is self.__objects:
+            FileStorage.__all_dirty = True
+        FileStorage.__indexed = self.__objects
+        for key, obj in list(self.__objects.items()):
+            self._index(key, obj, FileStorage.__by_class)
+
+    @staticmethod
+    def _reset_attr_indexes():
+        """empties the attribute indexes, rebuilt when next queried"""
+        FileStorage.__attr_indexed = set()
+        FileStorage.__by_attr = {}
+        FileStorage.__sorted = {}
+        FileStorage.__attr_values = {}
+
+    def _index_class(self, name):
+        """
+        adds the objects and records of class name to the attribute
+        indexes, unless they are in them already
+        """
+        with FileStorage.__index_lock:
+            objs = self._class_index().get(name, {})
+            if name in FileStorage.__attr_indexed or name not in indexed:
+                return
+            FileStorage.__attr_indexed.add(name)
+            for key, obj in list(objs.items()):
+                self._index_obj(key, name, obj)
+            for key, attrs in list(FileStorage.__raw.get(name, {}).items()):
+                self._index_raw(key, attrs)
+
+    def _index(self, key, obj, index):
+        """adds obj to the class and attribute indexes under key"""
+        name = obj.__class__.__name__
+        index.setdefault(name, {})[key] = obj
+        if name in FileStorage.__attr_indexed:
+            self._index_obj(key, name, obj)
+
+    def _index_obj(self, key, name, obj):
+        """adds obj to the attribute indexes of class name under key"""
+        values = tuple(getattr(obj, attr, None) for attr in indexed[name])
+        self._index_values(key, name, values, obj)
+
+    def _index_raw(self, key, attrs):
+        """adds the attributes kept under key to the attribute indexes"""
+        name = key.split(".")[0]
+        if name in FileStorage.__attr_indexed:
+            attrs = self._decode(key, attrs)
+            values = tuple(attrs.get(attr, getattr(classes[name], attr, None))
+                           for attr in indexed[name])
+            self._index_values(key, name, values, None)
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+    def _index_values(self, key, name, values, obj):
+        """adds obj to the attribute indexes of its class under values"""
+        FileStorage.__attr_values[key] = values
+        hashed = hash_indexes[name]
+        for attr, value in zip(hashed, values):
+            if _hashable(value):
+                FileStorage.__by_attr.setdefault(
+                    (name, attr), {}).setdefault(value, {})[key] = obj
+        if not FileStorage.__sorted:
+            return
+        for attr, value in zip(sorted_indexes[name], values[len(hashed):]):
+            sorted_index = FileStorage.__sorted.get((name, attr,
+                                                     _family(value)))
+            if sorted_index is not None:
+                sorted_index.add(_sortable(value), key)
+
+    def _unindex(self, key, index):
+        """removes key from the class and attribute indexes"""
+        name = key.split(".")[0]
+        index.get(name, {}).pop(key, None)
+        values = FileStorage.__attr_values.pop(key, ())
+        hashed = hash_indexes.get(name, ())
+        for attr, value in zip(hashed, values):
+            if not _hashable(value):
+                continue
+            bucket = FileStorage.__by_attr[(name, attr)][value]
+            bucket.pop(key, None)
+            if not bucket:
+                del FileStorage.__by_attr[(name, attr)][value]
+        for attr, value in zip(sorted_indexes.get(name, ()),
+                               values[len(hashed):]):
+            sorted_index = FileStorage.__sorted.get((name, attr,
+                                                     _family(value)))
+            if sorted_index is not None:
+                sorted_index.remove(_sortable(value), key)
+
+    def _sorted_index(self, name, attr, family):
+        """
+        returns the SortedIndex of the values of family of the attribute
+        attr of class name, building it on first use
+        """
+        with FileStorage.__index_lock:
+            sorted_index = FileStorage.__sorted.get((name, attr, family))
+            if sorted_index is None:
+                self._index_class(name)
+                position = indexed[name].index(attr)
+                keys = list(self._class_index().get(name, {}))
+                keys.extend(FileStorage.__raw.get(name, {}))
+                attr_values = FileStorage.__attr_values
+                pairs = []
+                for key in keys:
+                    value = attr_values[key][position]
+                    if _family(value) == family:
+                        pairs.append((_sortable(value), key))
+                sorted_index = SortedIndex(pairs)
+                FileStorage.__sorted[(name, attr, family)] = sorted_index
+            return sorted_index
+
+    def _put(self, key, obj, index):
+        """stores obj under key in __objects and the indexes"""
+        FileStorage.__invalid.pop(key, None)
+        raw = FileStorage.__raw.get(obj.__class__.__name__, {})
+        if key in self.__objects or raw.pop(key, None) is not None:
+            self._unindex(key, index)
+        self.__objects[key] = obj
+        self._index(key, obj, index)
+
+    def _put_raw(self, key, attrs, index, text=None):
+        """
+        keeps attrs, or their JSON text if given, under key until the
+        object is asked for
+        """
+        raw = FileStorage.__raw.setdefault(key.split(".")[0], {})
+        if raw.pop(key, None) is not None:
+            self._unindex(key, index)
+        raw[key] = attrs if text is None else text
+        self._index_raw(key, attrs)
+
+    @staticmethod
+    def _decode(key, attrs):
+        """returns the attributes of the raw record attrs kept under key"""
+        if isinstance(attrs, MappedSnapshot):
+            return attrs.load(key)
+        if isinstance(attrs, str):
+            return json.loads(attrs)
+        return attrs
+
+    def _instantiate(self, key, attrs, index):
+        """
+        returns the object attrs describe, or None if none can be built
+        from them: attrs are then kept in __invalid instead of whatever
+        was stored under key, so that they are written back as they are
+        """
+        try:
+            return classes[attrs["__class__"]](**attrs)
+        except Exception:
+            self._drop(key, index)
+            FileStorage.__invalid[key] = attrs
+            FileStorage.__counters["invalid"] += 1
+            return None
+
+    def _materialize(self, key):
+        """returns the object stored under key, instantiating it if needed"""
+        with FileStorage.__index_lock:
+            attrs = FileStorage.__raw.get(key.split(".")[0], {}).get(key)
+            if attrs is None:
+                return self.__objects.get(key)
+            index = self._class_index()
+            obj = self._instantiate(key, self._decode(key, attrs), index)
+            if obj is not None:
+                self._put(key, obj, index)
+                FileStorage.__counters["materialized"] += 1
+            return obj
+
+    def _materialize_all(self, name=None):
+        """instantiates every object of class name (default: all classes)"""
+        names = [name] if name is not None else list(FileStorage.__raw)
+        for name in names:
+            for key in list(FileStorage.__raw.get(name, ())):
+                self._materialize(key)
+
+    def _raw_attrs(self, raw):
+        """returns the attributes of the raw records, decoding them"""
+        return {key: self._decode(key, attrs) for key, attrs in raw.items()}
+
+    def _drop(self, key, index):
+        """removes key from __objects and the indexes, if present"""
+        FileStorage.__invalid.pop(key, None)
+        if self.__objects.pop(key, None) is None and \
+                FileStorage.__raw.get(key.split(".")[0], {}).pop(
+                    key, None) is None:
+            return False
+        self._unindex(key, index)
+        return True
+
+    def _journal_paths(self):
+        """returns the paths of the compacting and the active journal"""
+        return (self.__file_path + ".journal.1",
+                self.__file_path + ".journal")
+
+    def _file_format(self):
+        """returns the name of the serializer of the storage files"""
+        if self.__format:
+            return self.__format
+        for name, serializer in serializers.items():
+            if self.__file_path.endswith(serializer.extension):
+                return name
+        return "json"
+
+    def _shard_paths(self):
+        """returns the paths of the per-class files of the sharded layout"""
+        directory = self.__file_path + ".d"
+        extension = serializers[self._file_format()].extension
+        return {name: os.path.join(directory, name + extension)
+                for name in classes}
+
+    def _shard_files(self, name=None):
+        """
+        returns the paths the class files of the sharded layout may have
+        in any format, for the class name or all of them
+        """
+        directory = self.__file_path + ".d"
+        return [os.path.join(directory, clss + serializer.extension)
+                for clss in ([name] if name else classes)
+                for serializer in serializers.values()]
+
+    def _check_readable(self):
+        """
+        raises ValueError if the last reload could not decode a storage
+        file: a write would replace it with the objects read from the
+        others
+        """
+        for path, error in FileStorage.__unreadable.items():
+            raise ValueError("{} could not be decoded ({}), not overwriting "
+                             "it".format(path, error))
+
+    def _file_lock(self, exclusive=True):
+        """returns the process lock of the storage files, if enabled"""
+        if not self.__process_lock:
+            return nullcontext()
+        return FileLock(self.__file_path + ".lock", exclusive)
+
+    def _file_signature(self):
+        """returns (inode, size, mtime) of the JSON files and journals"""
+        sig = []
+        paths = (self.__file_path,) + self._journal_paths()
+        if self.__layout == "sharded":
+            paths += tuple(self._shard_files())
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                sig.append(None)
+                continue
+            sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(sig)
+
+    def all(self, cls=None, limit=None, after=None, load=None):
+        """
+        returns the dictionary __objects, or a copy of the objects of cls
+
+        __objects itself is only safe to iterate when no other thread
+        changes the storage; other threads should iterate all(cls).
+
+        With limit or after, returns a page of the objects instead, in
+        (created_at, id) order, read from the sorted index of created_at.
+
+        Args:
+            cls (object, optional): Class or class name
+            limit (int, optional): maximum number of objects of the page
+            after (string, optional): cursor of the object the page starts
+                after, see models.engine.pagination
+            load (optional): ignored, relationships are index lookups;
+                DBStorage eager loads them
+        """
+        if limit is not None or after is not None:
+            return self._page(cls, limit, after)
+        with self.__lock.read():
+            if cls is not None:
+                name = self._class_name(cls)
+                if FileStorage.__raw:
+                    self._materialize_all(name)
+                with FileStorage.__index_lock:
+                    return dict(self._class_index().get(name, {}))
+            if FileStorage.__raw:
+                self._materialize_all()
+            return self.__objects
+
+    def iter_all(self, cls=None, batch_size=1000):
+        """
+        yields the objects of cls (default: all classes) one by one
+
+        Only the keys are copied up front; the objects are looked up
+        batch_size at a time under the read lock, so that other threads
+        may change the storage meanwhile, and the objects of the records
+        reload() kept undecoded are built without being stored, so that
+        memory does not grow with the number of objects iterated.
+
+        Args:
+            cls (object, optional): Class or class name
+            batch_size (int, optional): number of objects looked up at once
+        """
+        names = [self._class_name(cls)] if cls is not None else None
+        with self.__lock.read(), FileStorage.__index_lock:
+            if names is None:
+                keys = list(self.__objects)
+                names = list(FileStorage.__raw)
+            else:
+                keys = list(self._class_index().get(names[0], {}))
+            for name in names:
+                keys.extend(FileStorage.__raw.get(name, {}))
+        for start in range(0, len(keys), batch_size):
+            batch = []
+            with self.__lock.read(), FileStorage.__index_lock:
+                for key in keys[start:start + batch_size]:
+                    obj = self.__objects.get(key)
+                    attrs = FileStorage.__raw.get(key.split(".")[0],
+                                                  {}).get(key)
+                    if obj is None and attrs is not None:
+                        obj = self._instantiate(key, self._decode(key, attrs),
+                                                self._class_index())
+                    if obj is not None:
+                        batch.append(obj)
+            yield from batch
+
+    def _page(self, cls, limit, after):
+        """all() with limit or after"""
+        created_at, id = pagination.decode(after) if after else (None, "")
+        value = _sortable(created_at)
+        names = [self._class_name(cls)] if cls is not None else list(classes)
+        positions = []
+        with self.__lock.read():
+            self._class_index()
+            with FileStorage.__index_lock:
+                for name in names:
+                    if name not in classes:
+                        continue
+                    index = self._sorted_index(name, "created_at", "str")
+                    column = indexed[name].index("created_at")
+                    for key in index.keys_after(value, name + "." + id,
+                                                limit):
+                        positions.append((
+                            _sortable(FileStorage.__attr_values[key][column]),
+                            key.split(".", 1)[1], key))
+                # the pages of several classes are merged
+                positions.sort()
+                objs = [self.__objects.get(key) or self._materialize(key)
+                        for _, _, key in positions[:limit]]
+        return {obj.__class__.__name__ + "." + obj.id: obj for obj in objs
+                if obj is not None}
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock.write():
+                self._put(key, obj, self._class_index())
+                FileStorage.__dirty[key] = obj
+
+    def bulk_new(self, objs, upsert=False):
+        """
+        sets in __objects the objs under a single write lock
+
+        Args:
+            objs (iterable): objects to add
+            upsert (bool, optional): accepted for DBStorage's sake; objects
+                replace the ones with the same key, as with new()
+        """
+        with self.__lock.write():
+            index = self._class_index()
+            for obj in objs:
+                if obj is not None:
+                    key = obj.__class__.__name__ + "." + obj.id
+                    self._put(key, obj, index)
+                    FileStorage.__dirty[key] = obj
+
+    def bulk_save(self, batch_size=None):
+        """
+        writes the objects passed to bulk_new() with a single save()
+
+        Args:
+            batch_size (int, optional): ignored, see DBStorage.bulk_save()
+        """
+        self.save()
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
-
-    def reload(self):
-        """deserializes the JSON file to __objects"""
+        """
+        serializes __objects to the JSON file (path: __file_path)
+
+        In group commit mode the write is deferred so that the saves made
+        within one interval, or one request, share a single write.
+        """
+        FileStorage.__counters["saves"] += 1
+        FileStorage.__pending += 1
+        if self.__group_commit is None:
+            self.flush(durable=False)
+            return
+        if self.__group_commit <= 0:
+            return
+        wait = FileStorage.__flushed_at + self.__group_commit - monotonic()
+        if wait <= 0:
+            self.flush()
+        elif FileStorage.__flush_timer is None:
+            timer = threading.Timer(wait, self.flush)
+            timer.daemon = True
+            FileStorage.__flush_timer = timer
+            timer.start()
+
+    def flush(self, durable=True):
+        """
+        writes the pending saves now
+
+        In journal mode only the objects passed to new()/delete() since the
+        last write are appended to the journal, and in the sharded layout
+        only the files of their classes are rewritten, unless __objects was
+        changed behind the storage's back.
+
+        The objects are serialized under the read lock, so that the file
+        holds a consistent snapshot; the file is written after releasing
+        it, without blocking the readers.
+
+        With the process lock, the changes other processes wrote since
+        the last read or write are merged first.
+
+        Args:
+            durable (bool, optional): fsync the journal before returning
+        """
+        with FileStorage.__flush_lock:
+            if FileStorage.__flush_timer is not None:
+                FileStorage.__flush_timer.cancel()
+                FileStorage.__flush_timer = None
+            saves = FileStorage.__pending
+            if not saves:
+                return
+            self._check_readable()
+            self._class_index()
+            with self._file_lock() as lock:
+                if lock is not None and \
+                        lock.version() != FileStorage.__version:
+                    self._merge()
+                    self._check_readable()
+                if self.__journal and not FileStorage.__all_dirty:
+                    self._append_journal(durable)
+                else:
+                    self._write_all()
+                if lock is not None:
+                    FileStorage.__version = lock.bump()
+            # the saves made while writing stay pending
+            FileStorage.__pending -= saves
+            FileStorage.__flushed_at = monotonic()
+            counters = FileStorage.__counters
+            counters["writes"] += 1
+            counters["last_write_saves"] = saves
+            counters["max_write_saves"] = max(counters["max_write_saves"],
+                                              saves)
+
+    def _write_all(self):
+        """
+        rewrites the JSON file, or the dirty class files of the sharded
+        layout, and drops the journals
+        """
+        self._wait_compaction()
+        # readers move lazy records from __raw to __objects under the index
+        # lock: without it a record could be missed by both loops below
+        with self.__lock.read(), FileStorage.__index_lock:
+            index = self._class_index()
+            names = None
+            if self.__layout == "sharded" and \
+                    not FileStorage.__all_dirty and \
+                    not os.path.exists(self.__file_path):
+                names = {key.split(".")[0] for key in FileStorage.__dirty}
+            dirty = dict(FileStorage.__dirty)
+            json_objects = {key: attrs for key, attrs
+                            in FileStorage.__invalid.items()
+                            if names is None or key.split(".")[0] in names}
+            for name in names if names is not None else classes:
+                for key, obj in list(index.get(name, {}).items()):
+                    json_objects[key] = obj.to_dict()
+                json_objects.update(self._raw_attrs(
+                    FileStorage.__raw.get(name, {})))
+        self._write_snapshot(json_objects, names)
+        for path in self._journal_paths():
+            if os.path.exists(path):
+                os.remove(path)
+        self._written(dirty, all_dirty=True)
+        FileStorage.__file_sig = self._file_signature()
+
+    def _written(self, dirty, all_dirty=False):
+        """
+        forgets the changes in dirty once they are written, unless they
+        were changed again meanwhile
+
+        Args:
+            dirty (dict): the changes written, key -> object or None
+            all_dirty (bool, optional): the whole storage was written
+        """
+        with self.__lock.write():
+            for key, obj in dirty.items():
+                if key in FileStorage.__dirty and \
+                        FileStorage.__dirty[key] is obj:
+                    del FileStorage.__dirty[key]
+            if all_dirty:
+                FileStorage.__all_dirty = False
+
+    def _write_snapshot(self, json_objects, names=None):
+        """
+        atomically replaces the JSON file with json_objects, or in the
+        sharded layout the files of the classes in names (default: all),
+        removing the files of the other layout and of the other formats
+        """
+        shard_paths = self._shard_paths()
+        if self.__layout != "sharded":
+            self._write_file(self.__file_path, json_objects)
+            paths = self._shard_files()
+        else:
+            shards = {name: {} for name in names or shard_paths}
+            for key, attrs in json_objects.items():
+                # records of unknown classes have no file in this layout
+                shard = shards.get(key.split(".")[0])
+                if shard is not None:
+                    shard[key] = attrs
+            os.makedirs(self.__file_path + ".d", exist_ok=True)
+            for name, shard in shards.items():
+                if shard:
+                    self._write_file(shard_paths[name], shard)
+                    FileStorage.__counters["shards_written"] += 1
+            paths = [path for name in shards
+                     for path in self._shard_files(name)
+                     if not shards[name] or path != shard_paths[name]]
+            if names is None:
+                paths.append(self.__file_path)
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _write_file(self, path, json_objects):
+        """atomically replaces the file at path with json_objects"""
+        serializer = serializers[self._file_format()]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w' + serializer.mode) as f:
+            serializer.dump(json_objects, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _snapshot_size(self):
+        """returns the size in bytes of the JSON file(s)"""
+        size = 0
+        for path in [self.__file_path] + self._shard_files():
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _append_journal(self, durable=False):
+        """appends the pending changes to the journal as NDJSON records"""
+        with self.__lock.read():
+            dirty = dict(FileStorage.__dirty)
+            if not dirty:
+                return
+            lines = []
+            for key, obj in dirty.items():
+                if obj is None:
+                    record = {"op": "del", "key": key}
+                else:
+                    record = {"op": "put", "key": key,
+                              "value": obj.to_dict()}
+                lines.append(json.dumps(record) + "\n")
+        data = "".join(lines).encode()
+        journal = self._journal_paths()[1]
+        with open(journal, 'ab', buffering=0) as f:
+            start = f.tell()
+            try:
+                while data:
+                    data = data[f.write(data):]
+                if durable:
+                    os.fsync(f.fileno())
+            except OSError:
+                # a record cut short would hide the ones appended after it
+                os.truncate(journal, start)
+                raise
+            size = f.tell()
+        self._written(dirty)
+        FileStorage.__counters["journal_appends"] += 1
+        FileStorage.__file_sig = self._file_signature()
+        # the threshold grows with the snapshot so that compaction stays
+        # amortized O(1) per write on large datasets
+        if size > max(self.__journal_max, self._snapshot_size()):
+            self._compact()
+
+    def _compact(self):
+        """folds the journal into a new snapshot in a background thread"""
+        if FileStorage.__compactor is not None and \
+                FileStorage.__compactor.is_alive():
+            return
+        old_journal, journal = self._journal_paths()
+        if os.path.exists(old_journal):
+            # left over by a crashed compaction: rewrite synchronously
+            self._write_all()
+            FileStorage.__counters["compactions"] += 1
+            return
+        os.replace(journal, old_journal)
+        with self.__lock.read(), FileStorage.__index_lock:
+            items = [(key, obj.to_dict())
+                     for key, obj in self.__objects.items()]
+            raws = [dict(raw) for raw in FileStorage.__raw.values()]
+            invalid = dict(FileStorage.__invalid)
+
+        def fold():
+            """writes the snapshot and drops the folded journal"""
+            json_objects = dict(invalid)
+            json_objects.update(items)
+            for raw in raws:
+                json_objects.update(self._raw_attrs(raw))
+            self._write_snapshot(json_objects)
+            os.remove(old_journal)
+            FileStorage.__counters["compactions"] += 1
+            FileStorage.__file_sig = self._file_signature()
+
+        if self.__process_lock:
+            # other processes must not write while the snapshot is written
+            fold()
+            return
+        FileStorage.__compactor = threading.Thread(target=fold, daemon=True)
+        FileStorage.__compactor.start()
+
+    def _wait_compaction(self):
+        """waits for a running compaction to finish"""
+        if FileStorage.__compactor is not None:
+            FileStorage.__compactor.join()
+            FileStorage.__compactor = None
+
+    def reload(self, parallel=False):
+        """
+        deserializes the JSON file to __objects one entry at a time, then
+        replays its journals
+
+        Objects whose updated_at did not change since they were loaded are
+        kept as they are instead of being rebuilt.
+
+        Args:
+            parallel (bool, optional): decode large class files of the
+                sharded layout with a process pool. Only models/__init__.py
+                passes True, for the reload at startup: the workers are
+                forked, which is not safe from a process already running
+                threads, such as the reload close() runs after a request.
+        """
+        with self._file_lock(exclusive=False) as lock, self.__lock.write():
+            self._reload(parallel)
+            if lock is not None:
+                FileStorage.__version = lock.version()
+
+    def _merge(self):
+        """
+        reloads the files, then puts back the objects passed to
+        new()/delete() since the last write, which are newer than what the
+        files hold
+        """
+        with self.__lock.write():
+            dirty = dict(FileStorage.__dirty)
+            self._reload()
+            index = self._class_index()
+            for key, obj in dirty.items():
+                if obj is None:
+                    self._drop(key, index)
+                else:
+                    self._put(key, obj, index)
+
+    def _reload(self, parallel=False):
+        """
+        reload() under the write lock
+
+        The objects the files no longer hold, deleted by another process,
+        are dropped, unless they were passed to new() since the last write,
+        a file could not be read or there is no file yet.
+        """
+        FileStorage.__counters["reloads_performed"] += 1
+        # rebuilt when next queried rather than updated for every record
+        self._reset_attr_indexes()
+        FileStorage.__file_sig = self._file_signature()
+        index = self._class_index()
+        FileStorage.__unreadable = {}
+        FileStorage.__invalid = {}
+        FileStorage.__seen = set()
+        try:
+            try:
+                if os.path.getsize(self.__file_path):
+                    self._read_file(self.__file_path, index)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                FileStorage.__unreadable[self.__file_path] = e
+            self._load_shards(index, parallel)
+            for path in self._journal_paths():
+                self._replay(path, index)
+            seen = FileStorage.__seen
+        finally:
+            FileStorage.__seen = None
+        if FileStorage.__all_dirty or FileStorage.__unreadable or \
+                not any(FileStorage.__file_sig):
+            return
+        keys = list(self.__objects)
+        for raw in FileStorage.__raw.values():
+            keys.extend(raw)
+        for key in keys:
+            if key not in seen and key not in FileStorage.__dirty:
+                self._drop(key, index)
+
+    def _load_shards(self, index, parallel=False):
+        """
+        loads the class files of the sharded layout, in parallel when
+        parallel and they hold more than parallel_load_min bytes
+
+        The workers are forked, so that they start with the modules
+        already imported; started with spawn or forkserver, each would
+        import models and reload the whole storage itself. Where fork is
+        not available, the files are loaded one after the other.
+        Mappable files are mapped rather than decoded.
+        """
+        formats = {}
+        for path in self._shard_files():
+            try:
+                if os.path.getsize(path):
+                    formats[path] = detect(path)
+            except OSError:
+                pass
+        decoded = [path for path, file_format in formats.items()
+                   if not serializers[file_format].mappable]
+        size = sum(os.path.getsize(path) for path in decoded)
+        workers = min(len(decoded), os.cpu_count() or 1)
+        shards = {}
+        if parallel and workers > 1 and size >= parallel_load_min and \
+                "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                shards = {path: pool.submit(read_shard, path, formats[path])
+                          for path in decoded}
+            FileStorage.__counters["parallel_loads"] += 1
+        for path in formats:
+            try:
+                if path in shards:
+                    for key, attrs in shards[path].result().items():
+                        self._load(key, attrs, index)
+                else:
+                    self._read_file(path, index)
+            except Exception as e:
+                FileStorage.__unreadable[path] = e
+
+    def _read_file(self, path, index):
+        """loads the file at path, in the format its magic bytes tell"""
+        file_format = detect(path)
+        serializer = serializers[file_format]
+        with open(path, 'r' + serializer.mode) as f:
+            if serializer.mappable:
+                self._map(serializer.map(f), index)
+            elif self.__lazy and file_format == "json":
+                # the JSON text of a record takes a fraction of the memory
+                # of its attributes
+                for key, attrs, text in serializer.iterload(f, text=True):
+                    self._load(key, attrs, index, text)
+            else:
+                for key, attrs in serializer.iterload(f):
+                    self._load(key, attrs, index)
+
+    def _map(self, snapshot, index):
+        """
+        keeps the records of a mapped snapshot undecoded, except the ones
+        of objects already in __objects, which are merged as by _load
+        """
+        for i, key in enumerate(snapshot.keys):
+            if key in self.__objects:
+                self._load(key, snapshot.load_at(i), index)
+            else:
+                self._put_raw(key, snapshot, index)
+        if FileStorage.__seen is not None:
+            FileStorage.__seen.update(snapshot.keys)
+        FileStorage.__counters["mapped"] += len(snapshot)
+
+    def _load(self, key, attrs, index, text=None):
+        """
+        puts the object described by attrs in __objects under key, or in
+        lazy mode keeps attrs, or their JSON text if given, in __raw
+        """
+        if FileStorage.__seen is not None:
+            FileStorage.__seen.add(key)
+        stamp = getattr(self.__objects.get(key), "updated_at", None)
+        updated_at = attrs.get("updated_at")
+        if isinstance(stamp, datetime) and (stamp == updated_at or
+                                            stamp.strftime(time) ==
+                                            updated_at):
+            return
+        if self.__lazy and key not in self.__objects:
+            self._put_raw(key, attrs, index, text)
+            return
+        obj = self._instantiate(key, attrs, index)
+        if obj is not None:
+            self._put(key, obj, index)
+
+    def _replay(self, path, index):
+        """
+        applies the journal records in path to __objects
+
+        A torn last line (a write cut short by a crash) is dropped from
+        the file. Any other record that cannot be applied is skipped and
+        the journal is reported as unreadable, so that it is not folded
+        into a snapshot without it.
+        """
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except Exception as e:
-            pass
+            f = open(path, 'rb')
+        except OSError:
+            return
+        with f:
+            good = 0
+            for number, line in enumerate(f, 1):
+                if not line.endswith(b"\n"):
+                    break
+                good += len(line)
+                try:
+                    record = json.loads(line)
+                    key = record["key"]
+                    if record["op"] == "put":
+                        self._load(key, record["value"], index)
+                    else:
+                        self._drop(key, index)
+                        if FileStorage.__seen is not None:
+                            FileStorage.__seen.discard(key)
+                except Exception as e:
+                    FileStorage.__unreadable.setdefault(path, ValueError(
+                        "record {}: {!r}".format(number, e)))
+            torn = f.tell() > good
+        if torn:
+            os.truncate(path, good)
+            FileStorage.__file_sig = self._file_signature()
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock.write():
+                if self._drop(key, self._class_index()):
+                    FileStorage.__dirty[key] = None
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
+        """
+        call reload() method for deserializing the JSON file to objects,
+        unless the file is unchanged since it was last read or written
+
+        Pending group commit saves are written first.
+        """
+        if FileStorage.__pending:
+            self.flush()
+        if self._file_signature() == FileStorage.__file_sig:
+            FileStorage.__counters["reloads_skipped"] += 1
+            return
+        self.reload()
+
+    def migrate(self, layout=None, file_format=None):
+        """
+        loads the storage and rewrites it in another layout or format,
+        removing the files of the previous ones
+
+        Args:
+            layout (string, optional): "single" or "sharded"
+            file_format (string, optional): "json", "binary" or "indexed"
+        """
         self.reload()
+        self._check_readable()
+        if layout is not None:
+            self.__layout = layout
+        if file_format is not None:
+            self.__format = file_format
+        FileStorage.__all_dirty = True
+        with FileStorage.__flush_lock, self._file_lock() as lock:
+            self._write_all()
+            if lock is not None:
+                FileStorage.__version = lock.bump()
+
+    def stats(self):
+        """returns a dictionary of the storage counters"""
+        return dict(FileStorage.__counters)
+
+    def queries(self, reset=False):
+        """
+        Returns the number of queries run for the current thread, always 0
+        as relationships and lookups are answered from the indexes; see
+        DBStorage.queries()
+        """
+        return 0
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=None):
         """
         Gets and returns the object based on the class and its ID
 
         Args:
-            cls (object): Class
+            cls (object): Class or class name
             id (string): String representing the object ID
+            load (optional): ignored, see all()
 
         Returns:
             The object based on the class and its ID, or None if not found
         """
-        # if cls in classes.values() and type(id) is str:
-        #     classname = shlex.split(str(cls))[1].strip(">").split(".")[2]
-        #     key = classname + "." + id
-        #     return self.all()[key]
-        if cls:
-            for value in self.__objects.values():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    if id == value.id:
-                        return value
+        if cls and id is not None:
+            key = self._class_name(cls) + "." + str(id)
+            with self.__lock.read():
+                obj = self.__objects.get(key)
+                if obj is None and FileStorage.__raw:
+                    obj = self._materialize(key)
+            return obj
         return None
 
+    def get_many(self, cls, ids, load=None):
+        """
+        Gets and returns the objects based on the class and their IDs
+
+        Args:
+            cls (object): Class or class name
+            ids (iterable): Strings representing the object IDs
+            load (optional): ignored, see all()
+
+        Returns:
+            The list of objects found, in the order of ids
+        """
+        if not cls:
+            return []
+        with self.__lock.read():
+            objs = [self.get(cls, id) for id in ids]
+        return [obj for obj in objs if obj is not None]
+
+    def related(self, cls, attr, value):
+        """
+        Returns the objects of a class whose foreign key attr equals value
+
+        Uses the hash indexes for the attributes listed in hash_indexes;
+        attribute changes are picked up when the object is saved.
+
+        Args:
+            cls (object): Class or class name
+            attr (string): Foreign key attribute, e.g. "state_id"
+            value (string): ID the attribute must be equal to
+
+        Returns:
+            The list of matching objects
+        """
+        name = self._class_name(cls)
+        if attr not in hash_indexes.get(name, ()) or not _hashable(value):
+            return [obj for obj in self.all(name).values()
+                    if getattr(obj, attr, None) == value]
+        with self.__lock.read():
+            self._index_class(name)
+            with FileStorage.__index_lock:
+                bucket = FileStorage.__by_attr.get((name, attr), {}).get(
+                    value, {})
+                objs = [self._materialize(key) if obj is None else obj
+                        for key, obj in list(bucket.items())]
+        return [obj for obj in objs if getattr(obj, attr, None) == value]
+
+    def filter(self, cls, limit=None, after=None, load=None, **criteria):
+        """
+        Returns the objects of a class matching every criterion
+
+        Equality and in criteria on the id and on the attributes listed in
+        hash_indexes, and all but ne criteria on the attributes listed in
+        sorted_indexes, are answered from the index that reads the fewest
+        keys; the other criteria are checked on each candidate, or on the
+        whole class without any index. Objects found through a sorted
+        index come in the order of its attribute.
+
+        With limit or after, returns a page of the matching objects in
+        (created_at, id) order, as all() does.
+
+        Args:
+            cls (object): Class or class name
+            limit (int, optional): maximum number of objects
+            after (string, optional): cursor of the object the page starts
+                after, see models.engine.pagination
+            load (optional): ignored, see all()
+            **criteria: attribute=value, or attribute__<operator>=value
+                with operator one of ne, lt, lte, gt, gte and in
+
+        Returns:
+            The list of matching objects
+        """
+        if limit is None and after is None:
+            return list(self._filter(cls, criteria))
+        if not criteria:
+            return list(self.all(cls, limit, after).values())
+        objs = sorted((obj for obj in self._filter(cls, criteria)
+                       if isinstance(obj.created_at, datetime)),
+                      key=lambda obj: (obj.created_at, obj.id))
+        if after:
+            position = pagination.decode(after)
+            objs = [obj for obj in objs
+                    if (obj.created_at, obj.id) > position]
+        return objs[:limit]
+
+    def find_one(self, cls, load=None, **criteria):
+        """
+        Returns the first object of a class matching every criterion, or
+        None; see filter()
+        """
+        return next(self._filter(cls, criteria), None)
+
+    def _filter(self, cls, criteria):
+        """yields the objects of cls matching the criteria"""
+        conditions = parse(criteria)
+        name = self._class_name(cls)
+        candidates = self._candidates(name, conditions)
+        if candidates is None:
+            candidates = self.all(name).values()
+        return (obj for obj in candidates if matches(obj, conditions))
+
+    def _candidates(self, name, conditions):
+        """
+        returns the objects of class name the most selective index finds
+        for conditions, or None when no index applies
+        """
+        windows = {}
+        plans = []
+        for attr, op, value in conditions:
+            values = list(value) if op == "in" else [value]
+            if not all(map(_hashable, values)):
+                # checked on each candidate
+                continue
+            values = list(dict.fromkeys(values))
+            if op in ("eq", "in") and attr == "id":
+                return self.get_many(name, values)
+            if op in ("eq", "in") and attr in hash_indexes.get(name, ()):
+                plans.append(("hash", attr, values))
+            elif op != "ne" and attr in sorted_indexes.get(name, ()) and \
+                    all(_family(v) for v in values):
+                values = [_sortable(v) for v in values]
+                if op == "in":
+                    plans.append(("sorted", attr,
+                                  [(v, v, True, True) for v in values]))
+                    continue
+                value = values[0]
+                low, high, low_closed, high_closed = windows.get(
+                    (attr, _family(value)), (None, None, True, True))
+                if op in ("eq", "gt", "gte") and (
+                        low is None or value > low or
+                        value == low and op == "gt"):
+                    low, low_closed = value, op != "gt"
+                if op in ("eq", "lt", "lte") and (
+                        high is None or value < high or
+                        value == high and op == "lt"):
+                    high, high_closed = value, op != "lt"
+                windows[(attr, _family(value))] = (low, high, low_closed,
+                                                   high_closed)
+        for (attr, family), window in windows.items():
+            plans.append(("sorted", attr, [window]))
+        if not plans:
+            return None
+        with self.__lock.read():
+            self._index_class(name)
+            with FileStorage.__index_lock:
+                plans.sort(key=lambda plan: self._cost(name, *plan))
+                keys = self._plan_keys(name, *plans[0])
+                # the keys of the other plans narrow the candidates down
+                # when they are not much more numerous
+                for plan in plans[1:]:
+                    if len(keys) < 2 or \
+                            self._cost(name, *plan) > 8 * len(keys):
+                        break
+                    others = set(self._plan_keys(name, *plan))
+                    keys = [key for key in keys if key in others]
+                objs = [self.__objects.get(key) or self._materialize(key)
+                        for key in keys]
+        return [obj for obj in objs if obj is not None]
+
+    def _plan_keys(self, name, kind, attr, args):
+        """returns the keys an index plan of _candidates finds"""
+        if kind == "hash":
+            buckets = FileStorage.__by_attr.get((name, attr), {})
+            return [key for value in args for key in buckets.get(value, ())]
+        return [key for window in args
+                for key in self._window_index(name, attr, window).keys(
+                    *window)]
+
+    def _cost(self, name, kind, attr, args):
+        """returns the number of keys an index plan of _candidates reads"""
+        if kind == "hash":
+            buckets = FileStorage.__by_attr.get((name, attr), {})
+            return sum(len(buckets.get(value, ())) for value in args)
+        return sum(self._window_index(name, attr, window).count(*window)
+                   for window in args)
+
+    def _window_index(self, name, attr, window):
+        """returns the SortedIndex holding the values of a window"""
+        family = _family(window[0] if window[0] is not None else window[1])
+        return self._sorted_index(name, attr, family)
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """
+        Returns the places in the cities of states or in cities (default:
+        anywhere) having every amenity of amenities, found through the
+        relation indexes
+
+        Args:
+            states (iterable, optional): State IDs
+            cities (iterable, optional): City IDs
+            amenities (iterable, optional): Amenity IDs
+
+        Returns:
+            The list of matching places, each place once
+        """
+        states, cities, amenities = set(states), set(cities), set(amenities)
+        if states or cities:
+            if states:
+                cities |= {city.id for city in
+                           self.filter(City, state_id__in=states)}
+            places = self.filter(Place, city_id__in=cities)
+        else:
+            places = list(self.all(Place).values())
+        if amenities:
+            if len(self.get_many(Amenity, amenities)) < len(amenities):
+                # an unknown amenity can't be present in any place
+                return []
+            places = [place for place in places
+                      if amenities <= set(place.amenity_ids)]
+        return places
+
     def count(self, cls=None):
         """
         Returns the number of objects in storage matching the given class.
@@ -104,13 +1361,20 @@ class FileStorage:
             The number of objects in storage matching the given class.
             If no class is passed, returns the count of all objects in storage.
         """
-        # count = self.all(cls)
-        # if cls in classes.values():
-        #     count = self.all(cls)
-        # return len(count)
-        if cls:
-            # all_objs_dict = self.all(cls)
-            count = len(self.all(cls))
-        else:
-            count = len(self.all())
-        return count
+        raw = FileStorage.__raw
+        with self.__lock.read(), FileStorage.__index_lock:
+            if cls:
+                name = self._class_name(cls)
+                return len(self._class_index().get(name, {})) + \
+                    len(raw.get(name, {}))
+            return len(self.__objects) + sum(map(len, raw.values()))
+
+    def counts(self):
+        """
+        Returns the number of objects of every class
+
+        Returns:
+            dict: class name -> number of objects
+        """
+        with self.__lock.read():
+            return {name: self.count(name) for name in classes}
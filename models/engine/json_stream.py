@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Contains iterload, an incremental reader for the top level of a JSON object
+"""
+
+import json
+import re
+
+_scan = json.JSONDecoder().scan_once
+_start = re.compile(r"[ \t\n\r]*\{[ \t\n\r]*(\}?)")
+_whitespace = re.compile(r"[ \t\n\r]*")
+_colon = re.compile(r"[ \t\n\r]*:[ \t\n\r]*")
+_separator = re.compile(r"[ \t\n\r]*([,}])")
+
+
+def iterload(f, chunk_size=1 << 16, text=False):
+    """
+    Yields the (key, value) pairs of the JSON object stored in f one at a
+    time, so only one value is decoded in memory at once
+
+    Args:
+        f (file): text file opened for reading
+        chunk_size (int, optional): number of characters read at a time
+        text (bool, optional): yield (key, value, JSON text of value)
+            triples instead
+
+    Raises:
+        ValueError: if f does not hold a JSON object
+    """
+    buf = f.read(chunk_size)
+    match = _start.match(buf)
+    while match is None or not match.group(1) and match.end() == len(buf):
+        chunk = f.read(chunk_size)
+        if not chunk:
+            if match is None:
+                raise ValueError("Expecting '{'")
+            raise ValueError("Unexpected end of JSON object")
+        buf += chunk
+        match = _start.match(buf)
+    if match.group(1):
+        return
+    pos = match.end()
+    while True:
+        # an entry is only taken once the ',' or '}' after it is in buf,
+        # anything cut by the end of buf is decoded again with more data
+        try:
+            pos = _whitespace.match(buf, pos).end()
+            key, end = _scan(buf, pos)
+            start = _colon.match(buf, end).end()
+            value, end = _scan(buf, start)
+            separator = _separator.match(buf, end)
+            if not isinstance(key, str) or separator is None:
+                raise ValueError
+        except (StopIteration, AttributeError, ValueError):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError("Invalid JSON object entry")
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield (key, value, buf[start:end]) if text else (key, value)
+        pos = separator.end()
+        if separator.group(1) == "}":
+            return
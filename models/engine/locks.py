@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+"""
+Contains the locks FileStorage synchronizes its users with
+"""
+
+from contextlib import contextmanager
+import fcntl
+import threading
+
+
+class RWLock:
+    """
+    a reader/writer lock: any number of readers or a single writer
+
+    Waiting writers keep new readers out so that they are not starved.
+    The lock is reentrant: a thread holding it may take it again to read,
+    and the writer may take it again to write. A reader cannot become the
+    writer.
+    """
+    def __init__(self):
+        """Instantiate a RWLock object"""
+        self.__cond = threading.Condition(threading.Lock())
+        # number of threads holding the lock to read
+        self.__readers = 0
+        # thread holding the lock to write, if any, and its reentrancy depth
+        self.__writer = None
+        self.__depth = 0
+        # number of threads waiting to write
+        self.__waiting = 0
+        # reads - reentrancy depth of the thread's read lock
+        # counted - True when the thread is counted in __readers
+        self.__local = threading.local()
+
+    def acquire_read(self):
+        """blocks until the lock can be held to read"""
+        local = self.__local
+        reads = getattr(local, "reads", 0)
+        if not reads:
+            local.counted = self.__writer is not threading.current_thread()
+            if local.counted:
+                with self.__cond:
+                    while self.__writer is not None or self.__waiting:
+                        self.__cond.wait()
+                    self.__readers += 1
+        local.reads = reads + 1
+
+    def release_read(self):
+        """releases the lock held to read"""
+        local = self.__local
+        local.reads -= 1
+        if not local.reads and local.counted:
+            with self.__cond:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__cond.notify_all()
+
+    def acquire_write(self):
+        """blocks until the lock can be held to write"""
+        me = threading.current_thread()
+        if self.__writer is me:
+            self.__depth += 1
+            return
+        if getattr(self.__local, "reads", 0):
+            raise RuntimeError("cannot upgrade a read lock to a write lock")
+        with self.__cond:
+            self.__waiting += 1
+            while self.__writer is not None or self.__readers:
+                self.__cond.wait()
+            self.__waiting -= 1
+            self.__writer = me
+            self.__depth = 1
+
+    def release_write(self):
+        """releases the lock held to write"""
+        self.__depth -= 1
+        if not self.__depth:
+            with self.__cond:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        """holds the lock to read for the duration of a with block"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """holds the lock to write for the duration of a with block"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class FileLock:
+    """
+    an fcntl lock on a file shared by the processes using the same storage
+
+    The file also holds a version stamp, which the holder of the exclusive
+    lock bumps every time it writes the storage.
+    """
+    def __init__(self, path, exclusive=True):
+        """
+        Instantiate a FileLock object
+
+        Args:
+            path (string): path to the lock file, created if needed
+            exclusive (bool, optional): take the lock to write rather
+                than to read
+        """
+        self.path = path
+        self.exclusive = exclusive
+        self.__file = None
+
+    def __enter__(self):
+        """blocks until the lock is held"""
+        self.__file = open(self.path, "a+b")
+        fcntl.flock(self.__file, fcntl.LOCK_EX if self.exclusive
+                    else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *exc):
+        """releases the lock"""
+        fcntl.flock(self.__file, fcntl.LOCK_UN)
+        self.__file.close()
+        self.__file = None
+
+    def version(self):
+        """returns the version stamp, 0 for a new lock file"""
+        self.__file.seek(0)
+        return int.from_bytes(self.__file.read(8), "little")
+
+    def bump(self):
+        """increments the version stamp and returns the new one"""
+        version = self.version() + 1
+        self.__file.truncate(0)
+        self.__file.write(version.to_bytes(8, "little"))
+        self.__file.flush()
+        return version
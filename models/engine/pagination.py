@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+"""
+Contains the cursors of the pages the storage engines return
+
+The objects of a class are paged in (created_at, id) order; a cursor
+holds the created_at and the id of the last object of a page, so that the
+next page starts right after it whatever was added or deleted meanwhile.
+"""
+
+import base64
+from datetime import datetime
+from models.base_model import time
+
+
+def encode(obj):
+    """returns the cursor of the page following obj"""
+    position = "{}|{}".format(obj.created_at.strftime(time), obj.id)
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode(cursor):
+    """
+    Returns the (created_at, id) position a cursor returned by encode()
+    holds
+
+    Raises:
+        ValueError: for a malformed cursor
+    """
+    try:
+        position = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (TypeError, AttributeError):
+        raise ValueError("Invalid cursor {!r}".format(cursor))
+    created_at, sep, id = position.partition("|")
+    if not sep or not id:
+        raise ValueError("Invalid cursor {!r}".format(cursor))
+    return datetime.strptime(created_at, time), id
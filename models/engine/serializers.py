@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+"""
+Contains the serializers FileStorage writes its snapshots with
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import json
+from models.base_model import time
+from models.engine.json_stream import iterload
+import mmap
+import re
+import struct
+
+
+def _default(value):
+    """returns the JSON form of the values json cannot encode"""
+    if isinstance(value, datetime):
+        return value.strftime(time)
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+class JSONSerializer:
+    """the JSON format of file.json: {"<class name>.id": {attributes}}"""
+    extension = ".json"
+    mode = ""
+    mappable = False
+
+    @staticmethod
+    def dump(json_objects, f):
+        """writes json_objects to the text file f"""
+        json.dump(json_objects, f, default=_default)
+
+    @staticmethod
+    def iterload(f, text=False):
+        """
+        yields the (key, attributes) pairs stored in the text file f, or
+        with text (key, attributes, JSON text of the attributes) triples
+        """
+        return iterload(f, text=text)
+
+
+class BinarySerializer:
+    """
+    a compact columnar format for FileStorage snapshots
+
+    The file starts with MAGIC and VERSION, followed by one section per
+    class: its name, its number of records, then for each attribute its
+    name, its type code, a bitmap of the records that have it and the
+    column of values. UUIDs are stored as 16 bytes, datetimes and the
+    timestamps of the DATETIMES attributes as microseconds since the epoch
+    and numbers as 8 bytes; strings are stored as lengths followed by one
+    UTF-8 blob, and any other value as JSON text. Keys are rebuilt as
+    <class name>.<id>, and timestamps are read back as datetime objects.
+    """
+    extension = ".bin"
+    mode = "b"
+    mappable = False
+    MAGIC = b"HBNB\0"
+    VERSION = 1
+    EPOCH = datetime(1970, 1, 1)
+    UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-"
+                      r"[0-9a-f]{12}\Z")
+    TIMESTAMP = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}\Z")
+    # attributes whose timestamp strings are datetimes, see BaseModel;
+    # the strings of any other attribute are read back as strings
+    DATETIMES = ("created_at", "updated_at")
+
+    @classmethod
+    def _type_of(cls, field, values):
+        """returns the type code fitting every value of the column field"""
+        if all(type(v) is datetime or field in cls.DATETIMES and
+               type(v) is str and cls.TIMESTAMP.match(v) for v in values):
+            return b"t"
+        if all(type(v) is str for v in values):
+            if all(cls.UUID.match(v) for v in values):
+                return b"u"
+            return b"s"
+        if all(type(v) is int and -1 << 63 <= v < 1 << 63 for v in values):
+            return b"i"
+        if all(type(v) is float for v in values):
+            return b"f"
+        return b"j"
+
+    @classmethod
+    def _encode(cls, code, values):
+        """returns the bytes of a column of values of type code"""
+        if code == b"u":
+            return bytes.fromhex("".join(values).replace("-", ""))
+        if code == b"t":
+            micro = timedelta(microseconds=1)
+            return array("q", [((v if type(v) is datetime else
+                                 datetime.fromisoformat(v)) - cls.EPOCH) //
+                               micro for v in values]).tobytes()
+        if code == b"i":
+            return array("q", values).tobytes()
+        if code == b"f":
+            return array("d", values).tobytes()
+        if code == b"j":
+            values = [json.dumps(v) for v in values]
+        blob = "".join(values).encode("utf-8")
+        return array("q", map(len, values)).tobytes() + blob
+
+    @classmethod
+    def _decode(cls, code, data, count):
+        """returns the count values of type code stored in data"""
+        if code == b"u":
+            hexa = data.hex()
+            return ["{}-{}-{}-{}-{}".format(hexa[i:i + 8], hexa[i + 8:i + 12],
+                                            hexa[i + 12:i + 16],
+                                            hexa[i + 16:i + 20],
+                                            hexa[i + 20:i + 32])
+                    for i in range(0, count * 32, 32)]
+        if code in (b"t", b"i", b"f"):
+            values = array("d" if code == b"f" else "q")
+            values.frombytes(data)
+            if code != b"t":
+                return values.tolist()
+            epoch = cls.EPOCH
+            return [epoch + timedelta(microseconds=v) for v in values]
+        lengths = array("q")
+        lengths.frombytes(data[:8 * count])
+        text = str(data[8 * count:], "utf-8")
+        values = []
+        start = 0
+        for length in lengths:
+            values.append(text[start:start + length])
+            start += length
+        if code == b"j":
+            return [json.loads(v) for v in values]
+        return values
+
+    @staticmethod
+    def _pack_str(text):
+        """returns text as a length-prefixed UTF-8 string"""
+        data = text.encode("utf-8")
+        return struct.pack("<I", len(data)) + data
+
+    @classmethod
+    def dump(cls, json_objects, f):
+        """writes json_objects to the binary file f"""
+        sections = {}
+        for attrs in json_objects.values():
+            sections.setdefault(attrs["__class__"], []).append(attrs)
+        f.write(cls.MAGIC + struct.pack("<BI", cls.VERSION, len(sections)))
+        for name, records in sections.items():
+            fields = {}
+            for attrs in records:
+                fields.update(dict.fromkeys(attrs))
+            del fields["__class__"]
+            f.write(cls._pack_str(name) +
+                    struct.pack("<QI", len(records), len(fields)))
+            for field in fields:
+                present = [field in attrs for attrs in records]
+                values = [attrs[field] for attrs in records if field in attrs]
+                code = cls._type_of(field, values)
+                data = cls._encode(code, values)
+                if all(present):
+                    bitmap = b"\1"
+                else:
+                    bits = bytearray((len(records) + 7) // 8)
+                    for i, has in enumerate(present):
+                        if has:
+                            bits[i >> 3] |= 1 << (i & 7)
+                    bitmap = b"\0" + bytes(bits)
+                f.write(cls._pack_str(field) + code + bitmap +
+                        struct.pack("<Q", len(data)) + data)
+
+    @classmethod
+    def iterload(cls, f):
+        """yields the (key, attributes) pairs stored in the binary file f"""
+        data = memoryview(f.read())
+        if bytes(data[:len(cls.MAGIC)]) != cls.MAGIC:
+            raise ValueError("Not a binary FileStorage snapshot")
+        pos = len(cls.MAGIC)
+        version, count = struct.unpack_from("<BI", data, pos)
+        if version != cls.VERSION:
+            raise ValueError("Unsupported snapshot version {}".format(
+                version))
+        pos += 5
+
+        def read_str():
+            """reads a length-prefixed UTF-8 string"""
+            nonlocal pos
+            size, = struct.unpack_from("<I", data, pos)
+            pos += 4 + size
+            return str(data[pos - size:pos], "utf-8")
+
+        for _ in range(count):
+            name = read_str()
+            size, nfields = struct.unpack_from("<QI", data, pos)
+            pos += 12
+            records = [{} for _ in range(size)]
+            for _ in range(nfields):
+                field = read_str()
+                code = bytes(data[pos:pos + 1])
+                if data[pos + 1]:
+                    owners = records
+                    pos += 2
+                else:
+                    bits = data[pos + 2:pos + 2 + (size + 7) // 8]
+                    owners = [attrs for i, attrs in enumerate(records)
+                              if bits[i >> 3] >> (i & 7) & 1]
+                    pos += 2 + (size + 7) // 8
+                length, = struct.unpack_from("<Q", data, pos)
+                pos += 8 + length
+                values = cls._decode(code, data[pos - length:pos],
+                                     len(owners))
+                for attrs, value in zip(owners, values):
+                    attrs[field] = value
+            for attrs in records:
+                attrs["__class__"] = name
+                yield name + "." + str(attrs["id"]), attrs
+
+
+class MappedSnapshot:
+    """
+    a read-only view of an indexed snapshot through a memory map
+
+    Only the sorted keys are decoded when the snapshot is opened; load()
+    finds a record with a binary search and decodes it alone. The pages
+    of the file are shared with every process mapping it.
+    """
+    def __init__(self, f):
+        """maps the indexed snapshot open in the binary file f"""
+        self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = IndexedSerializer.MAGIC + bytes([IndexedSerializer.VERSION])
+        if self.__map[:len(header)] != header:
+            raise ValueError("Not an indexed FileStorage snapshot")
+        count, start, size = struct.unpack_from("<QQQ", self.__map,
+                                                len(self.__map) - 24)
+        self.keys = str(self.__map[start:start + size],
+                        "utf-8").split("\n") if count else []
+        self.__offsets = array("q")
+        self.__offsets.frombytes(self.__map[start + size:
+                                            start + size + 8 * (count + 1)])
+
+    def __len__(self):
+        """returns the number of records in the snapshot"""
+        return len(self.keys)
+
+    def load(self, key):
+        """returns the attributes stored under key"""
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            raise KeyError(key)
+        return self.load_at(i)
+
+    def load_at(self, i):
+        """returns the attributes of the i-th record in key order"""
+        return json.loads(self.__map[self.__offsets[i]:
+                                     self.__offsets[i + 1]])
+
+
+class IndexedSerializer:
+    """
+    a snapshot format meant to be memory-mapped
+
+    The file starts with MAGIC and VERSION, followed by the records as
+    JSON objects in key order, the keys separated by newlines, the
+    offsets of the records and a footer holding the number of records and
+    the position and size of the keys.
+    """
+    extension = ".idx"
+    mode = "b"
+    mappable = True
+    MAGIC = b"HBNI\0"
+    VERSION = 1
+
+    @classmethod
+    def dump(cls, json_objects, f):
+        """writes json_objects to the binary file f"""
+        keys = sorted(json_objects)
+        f.write(cls.MAGIC + bytes([cls.VERSION]))
+        offsets = array("q", [f.tell()])
+        for key in keys:
+            offsets.append(offsets[-1] + f.write(json.dumps(
+                json_objects[key], default=_default).encode("utf-8")))
+        blob = "\n".join(keys).encode("utf-8")
+        f.write(blob + offsets.tobytes() +
+                struct.pack("<QQQ", len(keys), offsets[-1], len(blob)))
+
+    @staticmethod
+    def map(f):
+        """returns the MappedSnapshot of the binary file f"""
+        return MappedSnapshot(f)
+
+    @staticmethod
+    def iterload(f):
+        """yields the (key, attributes) pairs stored in the binary file f"""
+        snapshot = MappedSnapshot(f)
+        for i, key in enumerate(snapshot.keys):
+            yield key, snapshot.load_at(i)
+
+
+serializers = {"json": JSONSerializer, "binary": BinarySerializer,
+               "indexed": IndexedSerializer}
+
+
+def detect(path):
+    """
+    returns the name of the serializer that wrote the file at path, told
+    by the MAGIC its file starts with: JSON files have none
+    """
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    for name, serializer in serializers.items():
+        magic = getattr(serializer, "MAGIC", None)
+        if magic and head.startswith(magic):
+            return name
+    return "json"
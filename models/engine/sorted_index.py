@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+"""
+Contains the SortedIndex class
+"""
+
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+
+class SortedIndex:
+    """
+    the keys of a class's objects ordered by the value of one attribute
+
+    The (value, key) pairs are kept sorted in blocks of at most 2 * LOAD
+    pairs, each block holding its values and its keys in two parallel
+    lists, so that a pair is found with two binary searches and added or
+    removed by moving at most one block. The values of one index must be
+    comparable with each other.
+    """
+    LOAD = 1000
+
+    def __init__(self, pairs=()):
+        """
+        Instantiate a SortedIndex object
+
+        Args:
+            pairs (iterable, optional): (value, key) pairs to start with,
+                sorted once rather than added one by one
+        """
+        # two stable sorts order the pairs by value then key faster than
+        # comparing the pairs
+        pairs = sorted(pairs, key=itemgetter(1))
+        pairs.sort(key=itemgetter(0))
+        load = self.LOAD
+        self.__values = [[value for value, key in pairs[i:i + load]]
+                         for i in range(0, len(pairs), load)]
+        self.__keys = [[key for value, key in pairs[i:i + load]]
+                       for i in range(0, len(pairs), load)]
+        # the last pair and the last value of each block
+        self.__maxes = [(values[-1], keys[-1])
+                        for values, keys in zip(self.__values, self.__keys)]
+        self.__max_values = [values[-1] for values in self.__values]
+        self.__len = len(pairs)
+
+    def __len__(self):
+        """returns the number of keys in the index"""
+        return self.__len
+
+    def _find(self, value, key):
+        """returns the block and the position where (value, key) belongs"""
+        i = min(bisect_left(self.__maxes, (value, key)),
+                len(self.__maxes) - 1)
+        values = self.__values[i]
+        lo = bisect_left(values, value)
+        hi = bisect_right(values, value, lo)
+        return i, bisect_left(self.__keys[i], key, lo, hi)
+
+    def _update_max(self, i):
+        """records the last pair of block i, or drops the block if empty"""
+        if self.__values[i]:
+            self.__maxes[i] = (self.__values[i][-1], self.__keys[i][-1])
+            self.__max_values[i] = self.__values[i][-1]
+        else:
+            del self.__values[i], self.__keys[i]
+            del self.__maxes[i], self.__max_values[i]
+
+    def add(self, value, key):
+        """adds key under value"""
+        self.__len += 1
+        if not self.__values:
+            self.__values.append([value])
+            self.__keys.append([key])
+            self.__maxes.append((value, key))
+            self.__max_values.append(value)
+            return
+        i, j = self._find(value, key)
+        values, keys = self.__values[i], self.__keys[i]
+        values.insert(j, value)
+        keys.insert(j, key)
+        if len(values) > 2 * self.LOAD:
+            half = len(values) // 2
+            self.__values[i + 1:i + 1] = [values[half:]]
+            self.__keys[i + 1:i + 1] = [keys[half:]]
+            del values[half:], keys[half:]
+            self.__maxes.insert(i + 1, None)
+            self.__max_values.insert(i + 1, None)
+            self._update_max(i + 1)
+        self._update_max(i)
+
+    def remove(self, value, key):
+        """removes key from under value, if present"""
+        if not self.__values:
+            return
+        i, j = self._find(value, key)
+        keys = self.__keys[i]
+        if j < len(keys) and keys[j] == key and \
+                self.__values[i][j] == value:
+            del self.__values[i][j], keys[j]
+            self.__len -= 1
+            self._update_max(i)
+
+    def _bound(self, value, right):
+        """
+        returns the block and the position of the first pair whose value is
+        greater than value when right, or not less than value otherwise
+        """
+        search = bisect_right if right else bisect_left
+        i = search(self.__max_values, value)
+        if i == len(self.__values):
+            return i, 0
+        return i, search(self.__values[i], value)
+
+    def _window(self, low, high, low_closed, high_closed):
+        """returns the bounds of the pairs with low <= value <= high"""
+        start = (0, 0) if low is None else \
+            self._bound(low, not low_closed)
+        end = (len(self.__values), 0) if high is None else \
+            self._bound(high, high_closed)
+        return start, end
+
+    def count(self, low=None, high=None, low_closed=True, high_closed=True):
+        """
+        returns the number of keys whose value is between low and high
+
+        Args:
+            low, high: bounds of the values, None for no bound
+            low_closed, high_closed (bool, optional): whether a value equal
+                to the bound is counted
+        """
+        (i, j), (k, m) = self._window(low, high, low_closed, high_closed)
+        if (i, j) >= (k, m):
+            return 0
+        return sum(map(len, self.__values[i:k])) - j + m
+
+    def keys(self, low=None, high=None, low_closed=True, high_closed=True):
+        """
+        returns the keys whose value is between low and high, in the order
+        of their values; the arguments are those of count()
+        """
+        (i, j), (k, m) = self._window(low, high, low_closed, high_closed)
+        if (i, j) >= (k, m):
+            return []
+        if i == k:
+            return self.__keys[i][j:m]
+        keys = self.__keys[i][j:]
+        for block in self.__keys[i + 1:k]:
+            keys.extend(block)
+        if k < len(self.__keys):
+            keys.extend(self.__keys[k][:m])
+        return keys
+
+    def keys_after(self, value=None, key=None, limit=None):
+        """
+        returns the keys of the pairs following (value, key), or of the
+        first pairs when value is None, in the order of the pairs
+
+        Args:
+            value, key: pair the keys follow, which need not be in the index
+            limit (int, optional): maximum number of keys
+        """
+        if not self.__values:
+            return []
+        i, j = 0, 0
+        if value is not None:
+            i, j = self._find(value, key)
+            if j < len(self.__keys[i]) and self.__keys[i][j] == key and \
+                    self.__values[i][j] == value:
+                j += 1
+        keys = []
+        while i < len(self.__keys) and (limit is None or len(keys) < limit):
+            end = None if limit is None else j + limit - len(keys)
+            keys.extend(self.__keys[i][j:end])
+            i, j = i + 1, 0
+        return keys
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage, MeteredPool
+from os import getenv
+from sqlalchemy import create_engine, event
+
+
+class SQLiteStorage(DBStorage):
+    """
+    stores the objects of the DBStorage models in a SQLite file
+
+    A single-node engine between the JSON file and a MySQL server: the
+    tables have the indexes of the models, and the write-ahead log keeps
+    the file consistent across crashes while readers run alongside the
+    writer. Each thread gets its own connection from the pool.
+    """
+
+    def _create_engine(self):
+        """
+        returns the engine of the SQLite file HBNB_SQLITE_PATH (default
+        hbnb.db)
+
+        Each connection is set up with journal_mode=WAL,
+        synchronous=HBNB_SQLITE_SYNCHRONOUS (default NORMAL, which the
+        write-ahead log keeps crash safe), cache_size=HBNB_SQLITE_CACHE_SIZE
+        KiB (default 65536), foreign_keys=ON, and waits up to
+        HBNB_SQLITE_BUSY_TIMEOUT seconds (default 30) for the write lock.
+        The pool holds up to HBNB_SQLITE_POOL_SIZE (default 5) idle
+        connections.
+        """
+        path = getenv('HBNB_SQLITE_PATH', 'hbnb.db')
+        busy_timeout = float(getenv('HBNB_SQLITE_BUSY_TIMEOUT', 30))
+        engine = create_engine(
+            'sqlite:///' + path, poolclass=MeteredPool,
+            pool_size=int(getenv('HBNB_SQLITE_POOL_SIZE', 5)),
+            max_overflow=10, pool_timeout=busy_timeout,
+            # a pooled connection is used by one thread at a time
+            connect_args={"check_same_thread": False,
+                          "timeout": busy_timeout})
+        event.listen(engine, "connect", self._configure)
+        return engine
+
+    def _create_replicas(self):
+        """returns no replica: the readers share the file of the writer"""
+        return []
+
+    @staticmethod
+    def _configure(connection, record):
+        """sets the pragmas of a new connection"""
+        synchronous = getenv('HBNB_SQLITE_SYNCHRONOUS', 'NORMAL')
+        cache_size = int(getenv('HBNB_SQLITE_CACHE_SIZE', 65536))
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous={}".format(synchronous))
+        # negative: in KiB rather than in pages
+        cursor.execute("PRAGMA cache_size=-{:d}".format(cache_size))
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
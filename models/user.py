@@ -13,7 +13,7 @@ class User(BaseModel, Base):
     """Representation of a user """
     if models.storage_t == 'db':
         __tablename__ = 'users'
-        email = Column(String(128), nullable=False)
+        email = Column(String(128), nullable=False, index=True)
         password = Column(String(128), nullable=False)
         first_name = Column(String(128), nullable=True)
         last_name = Column(String(128), nullable=True)
@@ -25,6 +25,10 @@ class User(BaseModel, Base):
         first_name = ""
         last_name = ""
 
+    # attributes FileStorage indexes: "hash" for equality, "sorted" for
+    # ranges and ordering
+    indexes = {"email": "hash"}
+
     def __init__(self, *args, **kwargs):
         """initializes user"""
         if kwargs:
@@ -39,6 +43,19 @@ class User(BaseModel, Base):
     #         __v = hashlib.md5(str(__v).encode()).hexdigest()
     #     return super().__setattr__(__k, __v)
 
+    if models.storage_t != 'db':
+        @property
+        def places(self):
+            """getter for list of place instances owned by the user"""
+            from models.place import Place
+            return models.storage.related(Place, "user_id", self.id)
+
+        @property
+        def reviews(self):
+            """getter for list of review instances written by the user"""
+            from models.review import Review
+            return models.storage.related(Review, "user_id", self.id)
+
     def __set_password(self, pwd):
         """
             custom setter: encrypts password to MD5
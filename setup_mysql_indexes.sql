@@ -0,0 +1,26 @@
+-- adds the indexes of the models to the tables of a database created
+-- before them, e.g. mysql hbnb_dev_db < setup_mysql_indexes.sql
+-- (new databases get them from the models; run this script once)
+
+ALTER TABLE `amenities`
+  ADD INDEX `ix_amenities_created_at_id` (`created_at`, `id`),
+  ADD INDEX `ix_amenities_updated_at` (`updated_at`);
+ALTER TABLE `cities`
+  ADD INDEX `ix_cities_created_at_id` (`created_at`, `id`),
+  ADD INDEX `ix_cities_name` (`name`),
+  ADD INDEX `ix_cities_updated_at` (`updated_at`);
+ALTER TABLE `places`
+  ADD INDEX `ix_places_created_at_id` (`created_at`, `id`),
+  ADD INDEX `ix_places_price_by_night` (`price_by_night`),
+  ADD INDEX `ix_places_updated_at` (`updated_at`);
+ALTER TABLE `reviews`
+  ADD INDEX `ix_reviews_created_at_id` (`created_at`, `id`),
+  ADD INDEX `ix_reviews_updated_at` (`updated_at`);
+ALTER TABLE `states`
+  ADD INDEX `ix_states_created_at_id` (`created_at`, `id`),
+  ADD INDEX `ix_states_name` (`name`),
+  ADD INDEX `ix_states_updated_at` (`updated_at`);
+ALTER TABLE `users`
+  ADD INDEX `ix_users_created_at_id` (`created_at`, `id`),
+  ADD INDEX `ix_users_email` (`email`),
+  ADD INDEX `ix_users_updated_at` (`updated_at`);
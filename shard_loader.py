@@ -0,0 +1,19 @@
+#!/usr/bin/python3
+"""
+Contains read_shard, the function the process pool of FileStorage.reload()
+runs on the class files of the sharded layout
+
+It lives outside the models package on purpose: a worker unpickles it by
+importing its module, and importing anything under models from a worker
+forked while models is being imported would wait forever on the import
+lock of the package, held by the parent.
+"""
+
+from models.engine.serializers import serializers
+
+
+def read_shard(path, file_format):
+    """returns the dictionary stored in the file at path"""
+    serializer = serializers[file_format]
+    with open(path, 'r' + serializer.mode) as f:
+        return dict(serializer.iterload(f))
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Contains the TestCriteriaDocs and TestCriteria classes
+"""
+
+from models.engine import criteria
+from models.state import State
+import pep8
+import unittest
+
+
+class TestCriteriaDocs(unittest.TestCase):
+    """Tests to check the documentation and style of criteria"""
+    def test_pep8_conformance_criteria(self):
+        """Test that models/engine/criteria.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/criteria.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_criteria(self):
+        """Test tests/test_models/test_engine/test_criteria.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_criteria.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_criteria_module_docstring(self):
+        """Test for the criteria.py module docstring"""
+        self.assertIsNot(criteria.__doc__, None,
+                         "criteria.py needs a docstring")
+
+    def test_criteria_func_docstrings(self):
+        """Test for the parse and matches docstrings"""
+        for func in (criteria.parse, criteria.matches):
+            self.assertIsNot(func.__doc__, None,
+                             "{} needs a docstring".format(func.__name__))
+
+
+class TestCriteria(unittest.TestCase):
+    """Test the parse and matches functions"""
+    def test_parse(self):
+        """Test that parse splits the operators from the attributes"""
+        self.assertEqual(criteria.parse({"name": "a", "state_id__in": "xy",
+                                         "price_by_night__lte": 3}),
+                         [("name", "eq", "a"), ("state_id", "in", ["x", "y"]),
+                          ("price_by_night", "lte", 3)])
+        with self.assertRaises(ValueError):
+            criteria.parse({"name__like": "a%"})
+
+    def test_matches(self):
+        """Test that matches checks every condition"""
+        state = State(name="Iowa")
+        self.assertTrue(criteria.matches(state, []))
+        self.assertTrue(criteria.matches(state, criteria.parse(
+            {"name__in": ["Iowa", "Ohio"], "name__gt": "I"})))
+        self.assertFalse(criteria.matches(state, criteria.parse(
+            {"name": "Iowa", "id__ne": state.id})))
+        self.assertFalse(criteria.matches(state, criteria.parse(
+            {"missing__lt": 1})))
@@ -7,7 +7,7 @@ from models import storage
 from datetime import datetime
 import inspect
 import models
-from models.engine import db_storage
+from models.engine import db_storage, pagination
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -20,6 +20,8 @@ import os
 import pep8
 import unittest
 from os import environ
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 STORAGE_TYPE = environ.get('HBNB_TYPE_STORAGE')
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
@@ -114,6 +116,187 @@ class TestDBStorageMethods(unittest.TestCase):
         get = models.storage.get(State, first_state_id)
         self.assertEqual(get, None)
 
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_many(self):
+        """Test that get_many retrieves several objects at once"""
+        state1 = State(name="state1")
+        state2 = State(name="state2")
+        models.storage.new(state1)
+        models.storage.new(state2)
+        models.storage.save()
+        ids = [state2.id, "missing", state1.id]
+        found = models.storage.get_many("State", ids)
+        self.assertEqual([s.id for s in found], [state2.id, state1.id])
+        self.assertEqual(models.storage.get_many(State, []), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_filter(self):
+        """Test that filter and find_one select with a WHERE clause"""
+        state = State(name="filtered")
+        models.storage.new(state)
+        models.storage.save()
+        cities = [City(state_id=state.id, name="city{}".format(i))
+                  for i in range(3)]
+        for city in cities:
+            models.storage.new(city)
+        models.storage.save()
+        found = models.storage.filter(City, state_id=state.id,
+                                      name__in=["city0", "city2", "x"])
+        self.assertEqual(sorted(city.name for city in found),
+                         ["city0", "city2"])
+        found = models.storage.filter("City", state_id=state.id,
+                                      name__gte="city1")
+        self.assertEqual(len(found), 2)
+        self.assertIs(models.storage.find_one(State, id=state.id), state)
+        self.assertIsNone(models.storage.find_one(State, name="missing"))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_load(self):
+        """Test that eager loading walks relationships in constant queries"""
+        state = State(name="loaded")
+        user = User(email="loaded@hbnb.io", password="pwd")
+        amenity = Amenity(name="loaded")
+        models.storage.new(state)
+        models.storage.new(user)
+        models.storage.new(amenity)
+        for i in range(3):
+            city = City(state_id=state.id, name="city{}".format(i))
+            place = Place(city_id=city.id, user_id=user.id, name="place")
+            place.amenities.append(amenity)
+            models.storage.new(city)
+            models.storage.new(place)
+        models.storage.save()
+        models.storage.close()
+        models.storage.queries(reset=True)
+        state = models.storage.get(State, state.id,
+                                   load={"cities.places": "selectin"})
+        places = [place for city in state.cities for place in city.places]
+        self.assertEqual(len(places), 3)
+        self.assertEqual(models.storage.queries(), 3)
+        models.storage.close()
+        models.storage.queries(reset=True)
+        places = models.storage.filter(Place, user_id=user.id,
+                                       load={"amenities": "joined"})
+        self.assertEqual([len(place.amenities) for place in places],
+                         [1, 1, 1])
+        self.assertEqual(models.storage.queries(), 1)
+        with self.assertRaises(ValueError):
+            models.storage.all(Place, load={"amenities": "lazy"})
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search_places(self):
+        """Test that search_places finds each place once in one query"""
+        user = User(email="search@hbnb.io", password="pwd")
+        states = [State(name="state{}".format(i)) for i in range(2)]
+        cities = [City(state_id=state.id, name="city")
+                  for state in states for _ in range(2)]
+        places = [Place(city_id=city.id, user_id=user.id, name="place")
+                  for city in cities]
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        places[0].amenities.extend([wifi, pool])
+        places[1].amenities.append(wifi)
+        places[3].amenities.extend([wifi, pool])
+        for obj in [user, wifi, pool] + states + cities + places:
+            models.storage.new(obj)
+        models.storage.save()
+
+        def search(*args, **kwargs):
+            """returns the ids of the places found, in one query"""
+            models.storage.queries(reset=True)
+            found = models.storage.search_places(*args, **kwargs)
+            self.assertEqual(models.storage.queries(), 1)
+            return sorted(place.id for place in found)
+
+        ids = [place.id for place in places]
+        self.assertEqual(search([states[0].id], [cities[0].id, cities[2].id]),
+                         sorted(ids[:3]))
+        self.assertEqual(search(states=[states[1].id],
+                                amenities=[wifi.id, pool.id]), ids[3:])
+        self.assertEqual(search(amenities=[wifi.id, pool.id, wifi.id]),
+                         sorted([ids[0], ids[3]]))
+        self.assertEqual(search(amenities=[wifi.id, "missing"]), [])
+        self.assertEqual(len(search()), models.storage.count(Place))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk(self):
+        """Test batched bulk inserts, parents first, and upserts"""
+        states = [State(name="bulk{}".format(i)) for i in range(5)]
+        cities = [City(state_id=state.id, name="bulk") for state in states]
+        models.storage.bulk_new(cities + states)
+        models.storage.queries(reset=True)
+        models.storage.bulk_save(batch_size=2)
+        # 3 batches of states then 3 of cities, each committed
+        self.assertEqual(models.storage.queries(), 6)
+        ids = [state.id for state in states]
+        found = models.storage.filter(State, id__in=ids)
+        self.assertEqual(sorted(state.name for state in found),
+                         ["bulk{}".format(i) for i in range(5)])
+        self.assertEqual(len(models.storage.filter(City, state_id__in=ids)),
+                         5)
+        models.storage.close()
+        again = State(**dict(states[0].to_dict(), name="upserted"))
+        models.storage.bulk_new([again, State(name="bulk5")], upsert=True)
+        models.storage.bulk_save()
+        self.assertEqual(models.storage.get(State, again.id).name, "upserted")
+        self.assertEqual(len(models.storage.filter(
+            State, name__in=["bulk{}".format(i) for i in range(6)])), 5)
+        models.storage.bulk_new([states[1]])
+        with self.assertRaises(Exception):
+            models.storage.bulk_save()
+        models.storage.close()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_iter_all(self):
+        """Test that iter_all streams the objects of all()"""
+        state = State(name="streamed")
+        models.storage.new(state)
+        models.storage.new(City(state_id=state.id, name="city"))
+        models.storage.save()
+        objs = list(models.storage.iter_all(State, batch_size=1))
+        self.assertIn(state, objs)
+        self.assertEqual(len(objs), models.storage.count(State))
+        self.assertEqual(len(list(models.storage.iter_all())),
+                         models.storage.count())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_counts(self):
+        """Test that count and counts count the rows of every table"""
+        before = models.storage.counts()
+        self.assertEqual(sorted(before), sorted(db_storage.classes))
+        state = State(name="counted")
+        models.storage.new(state)
+        models.storage.new(City(state_id=state.id, name="city"))
+        models.storage.save()
+        after = models.storage.counts()
+        self.assertEqual(after["State"], before["State"] + 1)
+        self.assertEqual(after["City"], before["City"] + 1)
+        self.assertEqual(after["User"], before["User"])
+        self.assertEqual(models.storage.count(State), after["State"])
+        self.assertEqual(models.storage.count("City"), after["City"])
+        self.assertEqual(models.storage.count(), sum(after.values()))
+        self.assertEqual(models.storage.count("Missing"), 0)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pages(self):
+        """Test that all and filter page in (created_at, id) order"""
+        state = State(name="paged")
+        models.storage.new(state)
+        models.storage.save()
+        cities = [City(state_id=state.id, name="city{}".format(i),
+                       created_at=datetime(2017, 9, 28, 21, 3, i // 2))
+                  for i in range(5)]
+        for city in cities:
+            models.storage.new(city)
+        models.storage.save()
+        cities.sort(key=lambda city: (city.created_at, city.id))
+        page = models.storage.filter(City, limit=2, state_id=state.id)
+        self.assertEqual(page, cities[:2])
+        page = models.storage.filter(City, limit=2, state_id=state.id,
+                                     after=pagination.encode(page[-1]))
+        self.assertEqual(page, cities[2:4])
+        page = models.storage.all(City, 10, pagination.encode(cities[-2]))
+        self.assertEqual(list(page.values())[:1], cities[-1:])
+
     @unittest.skipIf(models.storage_t != 'db', "not testing file storage")
     def test_count(self):
         """Test that count returns the right number of objects in file.json"""
@@ -392,6 +575,221 @@ class TestPlaceDBInstances(unittest.TestCase):
         self.assertTrue(exist_in_all_place)
 
 
+class TestDBStoragePool(unittest.TestCase):
+    """Test the connection pool, against a SQLite stand-in database"""
+    def setUp(self):
+        """Configures a pool of one connection on pool.db"""
+        self.env = {"HBNB_DB_URL": "sqlite:///pool.db",
+                    "HBNB_MYSQL_POOL_SIZE": "1",
+                    "HBNB_MYSQL_MAX_OVERFLOW": "0",
+                    "HBNB_MYSQL_POOL_TIMEOUT": "0.1",
+                    "HBNB_MYSQL_POOL_RECYCLE": "60",
+                    "HBNB_MYSQL_POOL_PRE_PING": "0"}
+        # HBNB_ENV=test would drop the tables, checking a connection out
+        self.save = {name: environ.get(name)
+                     for name in list(self.env) + ["HBNB_ENV"]}
+        environ.update(self.env)
+        environ.pop("HBNB_ENV", None)
+        self.storage = db_storage.DBStorage()
+        self.engine = self.storage._DBStorage__engine
+
+    def tearDown(self):
+        """Restores the environment and removes the database"""
+        self.engine.dispose()
+        for name, value in self.save.items():
+            if value is None:
+                environ.pop(name, None)
+            else:
+                environ[name] = value
+        if os.path.exists("pool.db"):
+            os.remove("pool.db")
+
+    def test_config(self):
+        """Test that the pool is configured by the environment"""
+        pool = self.engine.pool
+        self.assertIsInstance(pool, db_storage.MeteredPool)
+        self.assertEqual(pool.size(), 1)
+        self.assertEqual(pool.timeout(), 0.1)
+        self.assertEqual(pool._recycle, 60)
+        self.assertFalse(pool._pre_ping)
+
+    def test_stats(self):
+        """Test the checkout counters and the connections in use"""
+        stats = self.storage.stats()
+        self.assertEqual(stats["checkouts"], 0)
+        self.assertEqual(stats["checked_out"], 0)
+        connection = self.engine.connect()
+        self.assertEqual(self.storage.stats()["checked_out"], 1)
+        with self.assertRaises(db_storage.TimeoutError):
+            self.engine.connect()
+        connection.close()
+        stats = self.storage.stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["checkout_timeouts"], 1)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checked_in"], 1)
+        self.assertGreaterEqual(stats["checkout_wait_max"], 0.1)
+        self.assertGreaterEqual(stats["checkout_wait_total"],
+                                stats["checkout_wait_max"])
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageReplicas(unittest.TestCase):
+    """Test the read replicas, against SQLite stand-in databases"""
+    def setUp(self):
+        """Configures primary.db and its replicas replica0.db, replica1.db"""
+        self.files = ["primary.db", "replica0.db", "replica1.db"]
+        self.env = {"HBNB_DB_URL": "sqlite:///primary.db",
+                    "HBNB_DB_REPLICA_URLS":
+                    "sqlite:///replica0.db, sqlite:///replica1.db"}
+        self.save = {name: environ.get(name)
+                     for name in list(self.env) + ["HBNB_ENV"]}
+        environ.update(self.env)
+        environ.pop("HBNB_ENV", None)
+        self.storage = db_storage.DBStorage()
+        self.storage.reload()
+        self.replicas = self.storage._DBStorage__replicas
+        # the stand-ins do not replicate: each holds a state of its own
+        for i, engine in enumerate(self.replicas):
+            models.base_model.Base.metadata.create_all(engine)
+            with Session(bind=engine) as session:
+                session.add(State(name="replica{:d}".format(i)))
+                session.commit()
+
+    def tearDown(self):
+        """Restores the environment and removes the databases"""
+        self.storage.close()
+        for engine in [self.storage._DBStorage__engine] + self.replicas:
+            engine.dispose()
+        for name, value in self.save.items():
+            if value is None:
+                environ.pop(name, None)
+            else:
+                environ[name] = value
+        for name in self.files:
+            if os.path.exists(name):
+                os.remove(name)
+
+    def names(self):
+        """returns the names of the states storage reads"""
+        return sorted(state.name for state in
+                      self.storage.all(State).values())
+
+    def test_round_robin(self):
+        """Test that each session reads from the next replica"""
+        self.assertEqual(len(self.replicas), 2)
+        self.assertEqual(self.names(), ["replica0"])
+        self.assertEqual(self.storage.count(State), 1)
+        self.storage.close()
+        self.assertEqual(self.names(), ["replica1"])
+        self.storage.close()
+        self.assertEqual(self.names(), ["replica0"])
+
+    def test_read_your_writes(self):
+        """Test that writes go to the primary, read until the session ends"""
+        self.assertEqual(self.names(), ["replica0"])
+        state = State(name="primary")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertEqual(self.names(), ["primary"])
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertEqual(self.storage.count(State), 1)
+        self.storage.close()
+        self.assertEqual(self.names(), ["replica1"])
+        self.assertIsNone(self.storage.get(State, state.id))
+        self.storage.new(State(name="second"))
+        self.storage.save()
+        self.assertEqual(self.names(), ["primary", "second"])
+
+
+def full_scans(connection, statement, parameters):
+    """
+    returns the tables the plan of statement reads in full, with EXPLAIN
+    on MySQL and EXPLAIN QUERY PLAN on SQLite
+
+    Scanning an index in its order, e.g. for an ORDER BY ... LIMIT, is not
+    a full table scan.
+    """
+    if connection.dialect.name == "mysql":
+        rows = connection.exec_driver_sql("EXPLAIN " + statement,
+                                          parameters).mappings()
+        return [row["table"] for row in rows if row["type"] == "ALL"]
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement,
+                                          parameters)
+        return [detail for id, parent, notused, detail in rows
+                if detail.startswith("SCAN ") and " USING " not in detail]
+    raise unittest.SkipTest("no EXPLAIN for " + connection.dialect.name)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageIndexes(unittest.TestCase):
+    """Test that the hot queries of DBStorage read through indexes"""
+    def assertIndexed(self, method, *args, **kwargs):
+        """
+        Fails if a SELECT that storage.method(*args, **kwargs) runs scans
+        a whole table
+        """
+        engine = storage._DBStorage__engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, many):
+            """records the SELECT statements"""
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+        engines = [engine] + storage._DBStorage__replicas
+        for replica in engines:
+            event.listen(replica, "before_cursor_execute", record)
+        try:
+            getattr(storage, method)(*args, **kwargs)
+        finally:
+            for replica in engines:
+                event.remove(replica, "before_cursor_execute", record)
+        self.assertTrue(statements, "{} ran no SELECT".format(method))
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                self.assertEqual(full_scans(connection, statement,
+                                            parameters), [],
+                                 "{} scans a whole table: {}".format(
+                                     method, statement))
+
+    def test_names(self):
+        """Test the lookups by name and email"""
+        self.assertIndexed("filter", State, name="California")
+        self.assertIndexed("filter", City, name="San Francisco")
+        self.assertIndexed("find_one", User, email="john@snow.io")
+
+    def test_children(self):
+        """Test the lists of the children of an object"""
+        self.assertIndexed("filter", City, state_id="0")
+        self.assertIndexed("filter", Place, limit=10, city_id="0")
+        self.assertIndexed("filter", Review, place_id="0")
+
+    def test_pages(self):
+        """Test the pages of all(), in (created_at, id) order"""
+        after = pagination.encode(State())
+        self.assertIndexed("all", State, limit=10)
+        self.assertIndexed("all", State, limit=10, after=after)
+
+    def test_ranges(self):
+        """Test the price filters and the sync of recent changes"""
+        self.assertIndexed("filter", Place, price_by_night__lte=100)
+        self.assertIndexed("filter", State,
+                           updated_at__gt=datetime(2017, 3, 25))
+        self.assertIndexed("filter", Place,
+                           created_at__gte=datetime(2017, 3, 25))
+
+    def test_get(self):
+        """Test the lookups by id"""
+        self.assertIndexed("get", Place, "0")
+        self.assertIndexed("get_many", Place, ["0", "1"])
+
+    def test_search_places(self):
+        """Test the search of places by state and amenity"""
+        self.assertIndexed("search_places", states=["0"], cities=["0"],
+                           amenities=["0", "1"])
+
+
 @unittest.skipIf(STORAGE_TYPE != 'db', 'skip if environ is not db')
 class TestCountGet(unittest.TestCase):
     """testing Count and Get methods"""
@@ -3,10 +3,11 @@
 Contains the TestFileStorageDocs classes
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import inspect
 import models
-from models.engine import file_storage
+from models.engine import file_storage, pagination
+from models.engine.locks import FileLock
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -15,9 +16,16 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
-from os import environ, stat, remove, path
+import multiprocessing
+from os import environ, mkdir, stat, remove, rmdir, path
 import pep8
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
@@ -162,3 +170,1425 @@ class TestFileStorageMethods(unittest.TestCase):
         count_state = models.storage.count(State)
         self.assertEqual(total, count_total)
         self.assertEqual(total_state, count_state)
+        counts = models.storage.counts()
+        self.assertEqual(counts["State"], 3)
+        self.assertEqual(counts["City"], 3)
+        self.assertEqual(counts["Amenity"], 0)
+        self.assertEqual(sum(counts.values()), count_total)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_all(self):
+        """Test that iter_all yields the objects of all() one by one"""
+        models.storage._FileStorage__objects = {}
+        states = [State(name="state{}".format(i)) for i in range(5)]
+        city = City(state_id=states[0].id, name="city")
+        for obj in states + [city]:
+            models.storage.new(obj)
+        objs = models.storage.iter_all(State, batch_size=2)
+        self.assertIs(next(objs), states[0])
+        # changes made while iterating are safe, and seen by the batches
+        # not looked up yet
+        models.storage.delete(states[3])
+        models.storage.new(State(name="late"))
+        self.assertEqual(list(objs), [states[1], states[2], states[4]])
+        self.assertEqual(len(list(models.storage.iter_all())), 6)
+        self.assertEqual(list(models.storage.iter_all("City")), [city])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_follows_new_and_delete(self):
+        """Test that all(cls) and count(cls) track new() and delete()"""
+        models.storage._FileStorage__objects = {}
+        state = State(name="California")
+        city = City(state_id=state.id, name="Fremont")
+        models.storage.new(state)
+        models.storage.new(city)
+        self.assertEqual(models.storage.all(State),
+                         {"State." + state.id: state})
+        self.assertEqual(models.storage.all("City"),
+                         {"City." + city.id: city})
+        self.assertEqual(models.storage.count("State"), 1)
+        models.storage.delete(state)
+        self.assertEqual(models.storage.all(State), {})
+        self.assertEqual(models.storage.count(State), 0)
+        self.assertEqual(models.storage.count(), 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_sees_direct_changes(self):
+        """Test that all(cls) notices changes made through all()"""
+        models.storage._FileStorage__objects = {}
+        state = State(name="Nevada")
+        models.storage.new(state)
+        self.assertEqual(models.storage.count(State), 1)
+        models.storage.all().pop("State." + state.id)
+        self.assertEqual(models.storage.count(State), 0)
+        self.assertEqual(models.storage.all(State), {})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_by_class_name(self):
+        """Test that get accepts a class name and misses cleanly"""
+        models.storage._FileStorage__objects = {}
+        state = State(name="Texas")
+        models.storage.new(state)
+        self.assertIs(models.storage.get("State", state.id), state)
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertIsNone(models.storage.get(City, state.id))
+        self.assertIsNone(models.storage.get(State, "missing"))
+        self.assertIsNone(models.storage.get(None, state.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_many(self):
+        """Test that get_many returns the found objects in order"""
+        models.storage._FileStorage__objects = {}
+        state1 = State(name="Ohio")
+        state2 = State(name="Utah")
+        models.storage.new(state1)
+        models.storage.new(state2)
+        ids = [state2.id, "missing", state1.id]
+        self.assertEqual(models.storage.get_many(State, ids),
+                         [state2, state1])
+        self.assertEqual(models.storage.get_many("State", []), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_skips_unchanged_file(self):
+        """Test that close does not reload a file it already has"""
+        models.storage._FileStorage__objects = {}
+        state = State(name="Oregon")
+        models.storage.new(state)
+        models.storage.save()
+        before = models.storage.stats()
+        models.storage.close()
+        after = models.storage.stats()
+        self.assertEqual(after["reloads_skipped"],
+                         before["reloads_skipped"] + 1)
+        self.assertEqual(after["reloads_performed"],
+                         before["reloads_performed"])
+        self.assertIs(models.storage.get(State, state.id), state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_reloads_changed_file(self):
+        """Test that close merges in changes made to file.json"""
+        models.storage._FileStorage__objects = {}
+        state = State(name="Idaho")
+        kept = State(name="Iowa")
+        models.storage.new(state)
+        models.storage.new(kept)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + state.id]["name"] = "Maine"
+        js["State." + state.id]["updated_at"] = "2030-01-01T00:00:00.000000"
+        other = State(name="Vermont")
+        js["State." + other.id] = other.to_dict()
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        before = models.storage.stats()
+        models.storage.close()
+        after = models.storage.stats()
+        self.assertEqual(after["reloads_performed"],
+                         before["reloads_performed"] + 1)
+        self.assertEqual(models.storage.get(State, state.id).name, "Maine")
+        self.assertIs(models.storage.get(State, kept.id), kept)
+        self.assertEqual(models.storage.get(State, other.id).name, "Vermont")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_drops_deleted_objects(self):
+        """Test that close drops the objects removed from file.json"""
+        models.storage._FileStorage__objects = {}
+        kept = State(name="Kansas")
+        deleted = State(name="Texas")
+        models.storage.new(kept)
+        models.storage.new(deleted)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        del js["State." + deleted.id]
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        unsaved = State(name="Ohio")
+        models.storage.new(unsaved)
+        models.storage.close()
+        self.assertIs(models.storage.get(State, kept.id), kept)
+        self.assertIsNone(models.storage.get(State, deleted.id))
+        self.assertIs(models.storage.get(State, unsaved.id), unsaved)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageJournal(unittest.TestCase):
+    """Test the journal mode of FileStorage"""
+    def setUp(self):
+        """Starts every test from an empty storage and no files"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "journal.json"
+        self.paths = ["journal.json", "journal.json.journal",
+                      "journal.json.journal.1"]
+
+    def tearDown(self):
+        """Restores the objects and removes the files"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__dirty = {}
+        FileStorage._FileStorage__pending = 0
+        FileStorage._FileStorage__unreadable = {}
+        FileStorage._FileStorage__file_path = "file.json"
+        for file_path in self.paths:
+            if path.exists(file_path):
+                remove(file_path)
+
+    def test_save_appends_to_journal(self):
+        """Test that save appends one record per change"""
+        storage = FileStorage(journal=True, journal_max=1 << 20)
+        state = State(name="Kansas")
+        storage.new(state)
+        storage.save()
+        storage.delete(state)
+        storage.save()
+        self.assertFalse(path.exists("journal.json"))
+        with open("journal.json.journal", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["op"] for r in records], ["put", "del"])
+        self.assertEqual(records[0]["value"], state.to_dict())
+
+    def test_reload_replays_journal(self):
+        """Test that reload applies the journal on top of the snapshot"""
+        storage = FileStorage(journal=True, journal_max=1 << 20)
+        kept = State(name="Alaska")
+        dropped = State(name="Hawaii")
+        storage.new(kept)
+        storage.new(dropped)
+        storage.save()
+        storage.delete(dropped)
+        kept.name = "Arizona"
+        kept.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, kept.id).name, "Arizona")
+        self.assertIsNone(storage.get(State, dropped.id))
+
+    def test_reload_drops_torn_line(self):
+        """Test that a record cut short by a crash is ignored"""
+        storage = FileStorage(journal=True, journal_max=1 << 20)
+        state = State(name="Georgia")
+        storage.new(state)
+        storage.save()
+        size = stat("journal.json.journal").st_size
+        with open("journal.json.journal", "a") as f:
+            f.write('{"op": "put", "key": "State.')
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Georgia")
+        self.assertEqual(stat("journal.json.journal").st_size, size)
+
+    def test_reload_reports_corrupt_record(self):
+        """Test that a corrupt record before the last one is reported"""
+        storage = FileStorage(journal=True, journal_max=1 << 20)
+        state = State(name="Maine")
+        storage.new(state)
+        storage.save()
+        with open("journal.json.journal", "a") as f:
+            f.write('{"op": "put", "key": "State.\n')
+        other = State(name="Vermont")
+        storage.new(other)
+        storage.save()
+        with open("journal.json.journal", "rb") as f:
+            content = f.read()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Maine")
+        self.assertEqual(storage.get(State, other.id).name, "Vermont")
+        storage.new(State(name="Ohio"))
+        with self.assertRaises(ValueError):
+            storage.save()
+        with open("journal.json.journal", "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_failed_append_is_retried(self):
+        """Test that the changes of a failed append are written next"""
+        storage = FileStorage(journal=True, journal_max=1 << 20,
+                              group_commit=0)
+        state = State(name="Iowa")
+        storage.new(state)
+        with mock.patch("os.fsync", side_effect=OSError("disk full")):
+            storage.save()
+            with self.assertRaises(OSError):
+                storage.flush()
+        self.assertEqual(stat("journal.json.journal").st_size, 0)
+        storage.flush()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Iowa")
+
+    def test_compaction(self):
+        """Test that a large journal is folded into file.json"""
+        storage = FileStorage(journal=True, journal_max=1)
+        compactions = storage.stats()["compactions"]
+        state = State(name="Nebraska")
+        storage.new(state)
+        storage.save()
+        storage._wait_compaction()
+        self.assertEqual(storage.stats()["compactions"], compactions + 1)
+        self.assertFalse(path.exists("journal.json.journal.1"))
+        with open("journal.json", "r") as f:
+            self.assertEqual(json.load(f),
+                             {"State." + state.id: state.to_dict()})
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageGroupCommit(unittest.TestCase):
+    """Test the group commit mode of FileStorage"""
+    def setUp(self):
+        """Starts every test from an empty storage and no files"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "group.json"
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("group.json"):
+            remove("group.json")
+
+    def test_saves_wait_for_close(self):
+        """Test that saves are coalesced into one write on close"""
+        storage = FileStorage(group_commit=0)
+        writes = storage.stats()["writes"]
+        states = [State(name="state{}".format(i)) for i in range(3)]
+        for state in states:
+            storage.new(state)
+            storage.save()
+        self.assertFalse(path.exists("group.json"))
+        self.assertEqual(storage.stats()["writes"], writes)
+        storage.close()
+        self.assertEqual(storage.stats()["writes"], writes + 1)
+        self.assertEqual(storage.stats()["last_write_saves"], 3)
+        with open("group.json", "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_saves_within_interval(self):
+        """Test that only the first save of an interval writes"""
+        storage = FileStorage(group_commit=3600)
+        FileStorage._FileStorage__flushed_at = float("-inf")
+        writes = storage.stats()["writes"]
+        storage.new(State(name="Delaware"))
+        storage.save()
+        storage.new(State(name="Florida"))
+        storage.save()
+        self.assertEqual(storage.stats()["writes"], writes + 1)
+        with open("group.json", "r") as f:
+            self.assertEqual(len(json.load(f)), 1)
+        storage.flush()
+        self.assertEqual(storage.stats()["writes"], writes + 2)
+        with open("group.json", "r") as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_failed_write_is_retried(self):
+        """Test that the saves of a failed write stay pending"""
+        storage = FileStorage(group_commit=0, journal=False,
+                              layout="single")
+        state = State(name="Montana")
+        storage.new(state)
+        storage.save()
+        with mock.patch.object(FileStorage, "_write_file",
+                               side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                storage.flush()
+        self.assertFalse(path.exists("group.json"))
+        storage.close()
+        self.assertEqual(storage.stats()["last_write_saves"], 1)
+        with open("group.json", "r") as f:
+            self.assertIn("State." + state.id, json.load(f))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageRelations(unittest.TestCase):
+    """Test the relation indexes of FileStorage"""
+    def setUp(self):
+        """Starts every test from an empty storage"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restores the objects"""
+        FileStorage._FileStorage__objects = self.save
+
+    def test_related_follows_new_and_delete(self):
+        """Test that related tracks new() and delete()"""
+        place = Place(city_id="c1", user_id="u1")
+        review = Review(place_id=place.id, user_id="u1")
+        self.storage.new(place)
+        self.storage.new(review)
+        self.assertEqual(self.storage.related(Place, "city_id", "c1"),
+                         [place])
+        self.assertEqual(self.storage.related("Review", "place_id",
+                                              place.id), [review])
+        self.assertEqual(len(self.storage.related(Review, "user_id", "u1")),
+                         1)
+        self.storage.delete(review)
+        self.assertEqual(self.storage.related(Review, "place_id", place.id),
+                         [])
+
+    def test_related_follows_saved_changes(self):
+        """Test that related picks up a foreign key changed then saved"""
+        city = City(state_id="s1")
+        self.storage.new(city)
+        city.state_id = "s2"
+        self.assertEqual(self.storage.related(City, "state_id", "s1"), [])
+        self.storage.new(city)
+        self.assertEqual(self.storage.related(City, "state_id", "s2"),
+                         [city])
+
+    def test_related_without_index(self):
+        """Test that related falls back to a scan for other attributes"""
+        state = State(name="Ohio")
+        self.storage.new(state)
+        self.assertEqual(self.storage.related(State, "name", "Ohio"),
+                         [state])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageLazy(unittest.TestCase):
+    """Test the lazy mode of FileStorage"""
+    def setUp(self):
+        """Saves a few objects to lazy.json and reloads them lazily"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "lazy.json"
+        self.state = State(name="Montana")
+        self.city = City(state_id=self.state.id, name="Helena")
+        storage = FileStorage()
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(lazy=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("lazy.json"):
+            remove("lazy.json")
+
+    def test_reload_does_not_instantiate(self):
+        """Test that reload keeps attributes and count still sees them"""
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(State), 1)
+
+    def test_reload_keeps_json_text(self):
+        """Test that the records read from JSON are kept as JSON text"""
+        text = FileStorage._FileStorage__raw["State"]["State." +
+                                                      self.state.id]
+        self.assertIsInstance(text, str)
+        self.assertEqual(json.loads(text), self.state.to_dict())
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Montana")
+
+    def test_get_keeps_identity(self):
+        """Test that get instantiates once and then returns the same obj"""
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertIs(self.storage.get("State", self.state.id), state)
+        self.assertIs(self.storage.all(State)["State." + state.id], state)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+
+    def test_relations(self):
+        """Test that relationship getters see lazily loaded objects"""
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual([city.name for city in state.cities], ["Helena"])
+
+    def test_compaction_keeps_lazy_objects(self):
+        """Test that journal compaction writes objects never instantiated"""
+        storage = FileStorage(lazy=True, journal=True, journal_max=1 << 20)
+        state = State(name="Idaho")
+        storage.new(state)
+        storage.save()
+        storage._compact()
+        storage._wait_compaction()
+        self.assertFalse(path.exists("lazy.json.journal.1"))
+        with open("lazy.json", "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["State." + self.state.id], self.state.to_dict())
+        self.assertEqual(js["City." + self.city.id], self.city.to_dict())
+        self.assertEqual(js["State." + state.id], state.to_dict())
+
+    def test_save_keeps_lazy_objects(self):
+        """Test that save writes objects that were never instantiated"""
+        self.storage.get(State, self.state.id).name = "Maine"
+        self.storage.save()
+        with open("lazy.json", "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["State." + self.state.id]["name"], "Maine")
+        self.assertEqual(js["City." + self.city.id], self.city.to_dict())
+
+    def test_iter_all(self):
+        """Test that iter_all builds the objects without storing them"""
+        state = self.storage.get(State, self.state.id)
+        objs = list(self.storage.iter_all(batch_size=1))
+        self.assertEqual(sorted(obj.to_dict()["__class__"] for obj in objs),
+                         ["City", "State"])
+        self.assertIn(state, objs)
+        city = list(self.storage.iter_all(City))
+        self.assertEqual([obj.to_dict() for obj in city],
+                         [self.city.to_dict()])
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        self.assertEqual(self.storage.count(), 2)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageSharded(unittest.TestCase):
+    """Test the sharded layout of FileStorage"""
+    def setUp(self):
+        """Starts every test from an empty storage and no files"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "shard.json"
+        self.state = State(name="Kentucky")
+        self.city = City(state_id=self.state.id, name="Frankfort")
+
+    def tearDown(self):
+        """Restores the objects and removes the files"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = "file.json"
+        file_storage.parallel_load_min = 1 << 20
+        for name in ("State", "City"):
+            if path.exists("shard.json.d/{}.json".format(name)):
+                remove("shard.json.d/{}.json".format(name))
+        if path.exists("shard.json.d"):
+            rmdir("shard.json.d")
+        if path.exists("shard.json"):
+            remove("shard.json")
+
+    def test_save_writes_dirty_shards(self):
+        """Test that save only rewrites the files of changed classes"""
+        storage = FileStorage(layout="sharded")
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        self.assertFalse(path.exists("shard.json"))
+        state_file = stat("shard.json.d/State.json")
+        written = storage.stats()["shards_written"]
+        self.city.name = "Louisville"
+        storage.new(self.city)
+        storage.save()
+        self.assertEqual(storage.stats()["shards_written"], written + 1)
+        self.assertEqual(stat("shard.json.d/State.json").st_ino,
+                         state_file.st_ino)
+        with open("shard.json.d/City.json", "r") as f:
+            self.assertEqual(json.load(f)["City." + self.city.id]["name"],
+                             "Louisville")
+
+    def test_reload_in_parallel(self):
+        """Test that reload decodes the class files with a process pool"""
+        storage = FileStorage(layout="sharded")
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        file_storage.parallel_load_min = 0
+        with mock.patch("os.cpu_count", return_value=2), \
+                mock.patch.object(file_storage, "ProcessPoolExecutor",
+                                  wraps=file_storage.ProcessPoolExecutor) \
+                as pool:
+            storage.reload(parallel=True)
+        self.assertTrue(pool.called)
+        context = pool.call_args.kwargs["mp_context"]
+        self.assertEqual(context.get_start_method(), "fork")
+        self.assertEqual(storage.get(State, self.state.id).name, "Kentucky")
+        self.assertEqual(storage.get(City, self.city.id).name, "Frankfort")
+        FileStorage._FileStorage__objects = {}
+        with mock.patch("os.cpu_count", return_value=None), \
+                mock.patch.object(file_storage, "ProcessPoolExecutor") as pool:
+            storage.reload(parallel=True)
+        self.assertFalse(pool.called)
+        self.assertEqual(storage.count(), 2)
+
+    def test_close_does_not_fork(self):
+        """Test that the reload of close() loads the files serially"""
+        storage = FileStorage(layout="sharded")
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_sig = None
+        file_storage.parallel_load_min = 0
+        with mock.patch("os.cpu_count", return_value=2), \
+                mock.patch.object(file_storage, "ProcessPoolExecutor") as pool:
+            storage.close()
+        self.assertFalse(pool.called)
+        self.assertEqual(storage.count(), 2)
+
+    def test_import_over_large_shards(self):
+        """
+        Test that importing models decodes large class files with the
+        process pool without hanging
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        mkdir(path.join(directory, "file.json.d"))
+        size = 0
+        for cls in (State, City):
+            objs = [cls(name="{} {:d}".format(cls.__name__, i))
+                    for i in range(4000)]
+            file_path = path.join(directory, "file.json.d",
+                                  cls.__name__ + ".json")
+            with open(file_path, "w") as f:
+                json.dump({cls.__name__ + "." + obj.id: obj.to_dict()
+                           for obj in objs}, f)
+            size += stat(file_path).st_size
+        self.assertGreater(size, file_storage.parallel_load_min)
+        env = dict(environ, HBNB_FILE_LAYOUT="sharded",
+                   PYTHONPATH=path.dirname(path.dirname(
+                       path.abspath(models.__file__))))
+        env.pop("HBNB_TYPE_STORAGE", None)
+        out = subprocess.check_output(
+            [sys.executable, "-c",
+             "import os; os.cpu_count = lambda: 2\n"
+             "from models import storage\n"
+             "print(storage.count(), storage.stats()['parallel_loads'])"],
+            cwd=directory, env=env, timeout=60)
+        self.assertEqual(out.split(), [b"8000", b"1"])
+
+    def test_migrate(self):
+        """Test that migrate moves the data from a layout to the other"""
+        storage = FileStorage()
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.migrate("sharded")
+        self.assertFalse(path.exists("shard.json"))
+        with open("shard.json.d/State.json", "r") as f:
+            self.assertEqual(json.load(f),
+                             {"State." + self.state.id: self.state.to_dict()})
+        FileStorage._FileStorage__objects = {}
+        storage.migrate("single")
+        self.assertFalse(path.exists("shard.json.d/State.json"))
+        with open("shard.json", "r") as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageBinary(unittest.TestCase):
+    """Test the binary snapshot format of FileStorage"""
+    def setUp(self):
+        """Starts every test from an empty storage"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file.bin"
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("file.bin"):
+            remove("file.bin")
+
+    def test_save_and_reload(self):
+        """Test that a .bin file is written and read in binary"""
+        storage = FileStorage()
+        state = State(name="Alabama")
+        storage.new(state)
+        storage.save()
+        with open("file.bin", "rb") as f:
+            self.assertTrue(f.read().startswith(b"HBNB"))
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).to_dict(),
+                         state.to_dict())
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageFormats(unittest.TestCase):
+    """Test switching the snapshot format of existing files"""
+    def setUp(self):
+        """Saves a state and a city to format.json"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "format.json"
+        self.state = State(name="Oregon")
+        self.city = City(state_id=self.state.id, name="Salem")
+        storage = self.storage(file_format="json")
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restores the objects and removes the files"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__unreadable = {}
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("format.json"):
+            remove("format.json")
+        if path.exists("format.json.d"):
+            shutil.rmtree("format.json.d")
+
+    def storage(self, **kwargs):
+        """returns a FileStorage ignoring the HBNB_FILE_* modes"""
+        kwargs.setdefault("layout", "single")
+        return FileStorage(journal=False, lazy=False, **kwargs)
+
+    def head(self, file_path):
+        """returns the first bytes of the file at file_path"""
+        with open(file_path, "rb") as f:
+            return f.read(4)
+
+    def test_reload_detects_format(self):
+        """Test that files are read in the format they were written in"""
+        storage = self.storage(file_format="binary")
+        storage.reload()
+        self.assertEqual(storage.count(), 2)
+        state = State(name="Nevada")
+        storage.new(state)
+        storage.save()
+        self.assertEqual(self.head("format.json"), b"HBNB")
+        FileStorage._FileStorage__objects = {}
+        storage = self.storage(file_format="indexed")
+        storage.reload()
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.get(City, self.city.id).name, "Salem")
+
+    def test_reload_detects_shard_formats(self):
+        """Test that class files of several formats are all read"""
+        self.storage(layout="sharded", file_format="json").migrate()
+        FileStorage._FileStorage__objects = {}
+        storage = self.storage(layout="sharded", file_format="binary")
+        storage.reload()
+        storage.get(State, self.state.id).name = "Idaho"
+        storage.new(storage.get(State, self.state.id))
+        storage.save()
+        self.assertFalse(path.exists("format.json.d/State.json"))
+        self.assertEqual(self.head("format.json.d/State.bin"), b"HBNB")
+        self.assertTrue(path.exists("format.json.d/City.json"))
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, self.state.id).name, "Idaho")
+        self.assertEqual(storage.get(City, self.city.id).name, "Salem")
+
+    def test_unreadable_file_is_not_overwritten(self):
+        """Test that no write replaces a file reload could not decode"""
+        with open("format.json", "r+b") as f:
+            f.write(b"HBNB\0")
+        with open("format.json", "rb") as f:
+            content = f.read()
+        storage = self.storage()
+        storage.reload()
+        self.assertEqual(storage.count(), 0)
+        storage.new(State(name="Utah"))
+        with self.assertRaises(ValueError):
+            storage.save()
+        with self.assertRaises(ValueError):
+            storage.migrate(file_format="binary")
+        with open("format.json", "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_migrate_format(self):
+        """Test that migrate rewrites the files in another format"""
+        storage = self.storage()
+        storage.migrate(file_format="binary")
+        self.assertEqual(self.head("format.json"), b"HBNB")
+        storage.migrate(layout="sharded", file_format="indexed")
+        self.assertFalse(path.exists("format.json"))
+        self.assertEqual(self.head("format.json.d/State.idx"), b"HBNI")
+        FileStorage._FileStorage__objects = {}
+        storage = self.storage(file_format="json")
+        storage.reload()
+        self.assertEqual(storage.get(State, self.state.id).name, "Oregon")
+        self.assertEqual(storage.get(City, self.city.id).name, "Salem")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageIndexed(unittest.TestCase):
+    """Test the memory-mapped indexed snapshot format of FileStorage"""
+    def setUp(self):
+        """Saves a few objects to file.idx and maps them back"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file.idx"
+        self.state = State(name="Arizona")
+        self.city = City(state_id=self.state.id, name="Phoenix")
+        storage = FileStorage()
+        storage.new(self.state)
+        storage.new(self.city)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("file.idx"):
+            remove("file.idx")
+
+    def test_reload_maps(self):
+        """Test that reload decodes nothing and count still sees all"""
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(City), 1)
+
+    def test_get_decodes_one(self):
+        """Test that get decodes only the record asked for"""
+        materialized = self.storage.stats()["materialized"]
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertEqual(self.storage.stats()["materialized"],
+                         materialized + 1)
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["State." + self.state.id])
+
+    def test_relations(self):
+        """Test that relationship getters see mapped objects"""
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual([city.name for city in state.cities], ["Phoenix"])
+
+    def test_save_keeps_mapped_objects(self):
+        """Test that save writes objects that were never decoded"""
+        self.storage.get(State, self.state.id).name = "Utah"
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__raw = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, self.state.id).name, "Utah")
+        self.assertEqual(self.storage.get(City, self.city.id).to_dict(),
+                         self.city.to_dict())
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageThreads(unittest.TestCase):
+    """Test FileStorage used by many threads at once"""
+    def setUp(self):
+        """Starts from an empty storage saving to threads.json"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "threads.json"
+        self.errors = []
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("threads.json"):
+            remove("threads.json")
+
+    def run_threads(self, *targets):
+        """runs every target in its own thread and records their errors"""
+        def run(target):
+            """calls target, keeping the exception it raises"""
+            try:
+                target()
+            except Exception as e:
+                self.errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(target,))
+                   for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.errors, [])
+
+    def test_save_while_materializing(self):
+        """Test that saves see every lazy record readers instantiate"""
+        states = [State(name="state {}".format(i)) for i in range(2000)]
+        storage = FileStorage(lazy=True, journal=False, layout="single")
+        storage.bulk_new(states)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        done = threading.Event()
+
+        def reader():
+            """instantiates the states one by one"""
+            for state in states:
+                storage.get(State, state.id)
+            done.set()
+
+        def writer():
+            """rewrites the file and the journal until the reader is done"""
+            while not done.is_set():
+                FileStorage._FileStorage__all_dirty = True
+                storage.save()
+                with open("threads.json", "r") as f:
+                    self.assertEqual(len(json.load(f)), len(states))
+                open("threads.json.journal", "w").close()
+                storage._compact()
+                storage._wait_compaction()
+                with open("threads.json", "r") as f:
+                    self.assertEqual(len(json.load(f)), len(states))
+
+        self.run_threads(reader, writer)
+        FileStorage._FileStorage__raw = {}
+
+    def test_stress(self):
+        """Test concurrent new/delete/save against concurrent readers"""
+        storage = FileStorage()
+        kept = {}
+        done = threading.Event()
+
+        def writer(n):
+            """adds states and cities, deleting every other state"""
+            for i in range(30):
+                state = State(name="state {} {}".format(n, i))
+                city = City(state_id=state.id, name="city")
+                storage.new(state)
+                storage.new(city)
+                storage.save()
+                if i % 2:
+                    storage.delete(state)
+                    storage.save()
+                else:
+                    kept[state.id] = city.id
+
+        def reader():
+            """reads the storage until the writers are done"""
+            while not done.is_set():
+                states = storage.all(State)
+                for key, state in states.items():
+                    self.assertEqual(key, "State." + state.id)
+                    storage.get(State, state.id)
+                    self.assertLessEqual(
+                        len(storage.related(City, "state_id", state.id)), 1)
+                storage.count(City)
+                storage.count()
+
+        writers = [lambda n=n: writer(n) for n in range(4)]
+
+        def writers_then_done():
+            """runs the writers, then stops the readers"""
+            try:
+                self.run_threads(*writers)
+            finally:
+                done.set()
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            self.run_threads(writers_then_done, reader, reader, reader)
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(storage.count(State), 60)
+        self.assertEqual(storage.count(City), 120)
+        for state_id, city_id in kept.items():
+            self.assertEqual([city.id for city in storage.related(
+                City, "state_id", state_id)], [city_id])
+        with open("threads.json", "r") as f:
+            self.assertEqual(set(json.load(f)), set(storage.all()))
+
+    def test_write_does_not_block(self):
+        """Test that the file is written without holding off other users"""
+        storage = FileStorage()
+        state = State(name="Oregon")
+        storage.new(state)
+        writing = threading.Event()
+        release = threading.Event()
+        write_file = storage._write_file
+
+        def slow_write_file(*args):
+            """writes the file once the test lets it"""
+            writing.set()
+            release.wait(5)
+            write_file(*args)
+
+        storage._write_file = slow_write_file
+        saver = threading.Thread(target=storage.save)
+        saver.start()
+        writing.wait(5)
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertEqual(storage.count(State), 1)
+        storage.new(State(name="Idaho"))
+        release.set()
+        saver.join()
+        self.assertEqual(storage.count(State), 2)
+
+    def test_snapshot_excludes_writers(self):
+        """Test that new() waits until save() took its snapshot"""
+        storage = FileStorage()
+        state = State(name="Vermont")
+        other = State(name="Maine")
+        storage.new(state)
+        blocked = []
+
+        def to_dict():
+            """tries to add an object while the snapshot is taken"""
+            del state.to_dict
+            adder = threading.Thread(target=storage.new, args=(other,))
+            adder.start()
+            adder.join(0.2)
+            blocked.append(adder.is_alive())
+            return state.to_dict()
+
+        state.to_dict = to_dict
+        storage.save()
+        self.assertEqual(blocked, [True])
+        with open("threads.json", "r") as f:
+            self.assertEqual(list(json.load(f)), ["State." + state.id])
+        self.assertIs(storage.get(State, other.id), other)
+
+
+def add_states(worker, count):
+    """saves count states from a FileStorage using the process lock"""
+    FileStorage._FileStorage__objects = {}
+    storage = FileStorage(process_lock=True)
+    storage.reload()
+    for i in range(count):
+        storage.new(State(name="state {} {}".format(worker, i)))
+        storage.save()
+    storage.delete(storage.get(State, "shared"))
+    storage.save()
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageProcesses(unittest.TestCase):
+    """Test several processes writing to the same FileStorage files"""
+    def setUp(self):
+        """Starts from an empty storage saving to procs.json"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "procs.json"
+
+    def tearDown(self):
+        """Restores the objects and removes the files"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = "file.json"
+        for name in ("procs.json", "procs.json.lock", "procs.json.journal"):
+            if path.exists(name):
+                remove(name)
+
+    def run_workers(self, storage):
+        """runs 8 processes adding 20 states each, returns the states"""
+        shared = State(id="shared", name="shared")
+        storage.new(shared)
+        storage.save()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=add_states, args=(n, 20))
+                   for n in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        return storage.all(State)
+
+    def test_no_lost_updates(self):
+        """Test that concurrent writers all see their states saved"""
+        states = self.run_workers(FileStorage(process_lock=True))
+        self.assertEqual(len(states), 160)
+        self.assertNotIn("State.shared", states)
+
+    def test_no_lost_updates_journal(self):
+        """Test that concurrent writers merge the journal as well"""
+        states = self.run_workers(FileStorage(process_lock=True,
+                                              journal=True))
+        self.assertEqual(len(states), 160)
+
+    def test_merge_keeps_local_changes(self):
+        """Test that a writer's own changes win over the file's"""
+        storage = FileStorage(process_lock=True)
+        state = State(name="Ohio")
+        storage.new(state)
+        storage.save()
+        other = State(name="Iowa")
+        with open("procs.json", "r") as f:
+            js = json.load(f)
+        js["State." + other.id] = other.to_dict()
+        js["State." + state.id]["name"] = "Old"
+        with open("procs.json", "w") as f:
+            json.dump(js, f)
+        with FileLock("procs.json.lock") as lock:
+            lock.bump()
+        state.name = "New"
+        storage.new(state)
+        storage.save()
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertEqual(storage.get(State, other.id).name, "Iowa")
+        with open("procs.json", "r") as f:
+            self.assertEqual(json.load(f)["State." + state.id]["name"],
+                             "New")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageFilter(unittest.TestCase):
+    """Test the filter and find_one methods of FileStorage"""
+    def setUp(self):
+        """Adds a state, its cities and places to an empty storage"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.state = State(name="Texas")
+        self.cities = [City(state_id=self.state.id, name="city{}".format(i))
+                       for i in range(3)]
+        self.places = [Place(city_id=city.id, name="place",
+                             price_by_night=50 * i)
+                       for i, city in enumerate(self.cities)]
+        for obj in [self.state] + self.cities + self.places:
+            self.storage.new(obj)
+
+    def tearDown(self):
+        """Restores the objects"""
+        FileStorage._FileStorage__objects = self.save
+
+    def test_equality(self):
+        """Test equality criteria, indexed or not"""
+        self.assertEqual(self.storage.filter(City, state_id=self.state.id),
+                         self.cities)
+        self.assertEqual(self.storage.filter("City", name="city1"),
+                         [self.cities[1]])
+        self.assertEqual(self.storage.filter(City, state_id="missing"), [])
+
+    def test_in(self):
+        """Test in criteria on ids, indexed and plain attributes"""
+        ids = [self.cities[2].id, "missing", self.cities[0].id]
+        self.assertEqual(self.storage.filter(City, id__in=ids),
+                         [self.cities[2], self.cities[0]])
+        self.assertEqual(self.storage.filter(
+            Place, city_id__in=[self.cities[1].id, self.cities[1].id]),
+            [self.places[1]])
+        self.assertEqual(self.storage.filter(City, name__in=("city0",)),
+                         [self.cities[0]])
+
+    def test_ranges(self):
+        """Test range criteria combined with other criteria"""
+        self.assertEqual(self.storage.filter(Place, price_by_night__gte=50),
+                         self.places[1:])
+        self.assertEqual(self.storage.filter(Place, price_by_night__lt=50,
+                                             name="place"),
+                         self.places[:1])
+        self.assertEqual(self.storage.filter(Place, price_by_night__ne=50,
+                                             price_by_night__lte=100),
+                         [self.places[0], self.places[2]])
+        self.assertEqual(self.storage.filter(Place, description__gt=0), [])
+
+    def test_find_one(self):
+        """Test that find_one returns the first match or None"""
+        self.assertIs(self.storage.find_one(City, id=self.cities[1].id),
+                      self.cities[1])
+        self.assertIs(self.storage.find_one(Place, price_by_night__gt=0),
+                      self.places[1])
+        self.assertIsNone(self.storage.find_one(State, name="Utah"))
+
+    def test_unknown_operator(self):
+        """Test that an unknown operator is refused"""
+        with self.assertRaises(ValueError):
+            self.storage.filter(Place, price_by_night__between=(1, 2))
+
+    def test_search_places(self):
+        """Test the places_search lookups: location union, all amenities"""
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        self.storage.new(wifi)
+        self.storage.new(pool)
+        self.places[0].amenity_ids = [wifi.id, pool.id]
+        self.places[1].amenity_ids = [wifi.id]
+        search = self.storage.search_places
+        self.assertEqual(search(), self.storage.filter(Place))
+        # a city named directly and through its state counts once
+        self.assertEqual(sorted(place.id for place in search(
+            [self.state.id], [self.cities[0].id])),
+            sorted(place.id for place in self.places))
+        self.assertEqual(search(cities=[self.cities[1].id]),
+                         [self.places[1]])
+        self.assertEqual(search(states=["missing"]), [])
+        self.assertEqual(sorted(place.id for place in search(
+            amenities=[wifi.id])), sorted([self.places[0].id,
+                                          self.places[1].id]))
+        self.assertEqual(search(cities=[self.cities[0].id,
+                                        self.cities[1].id],
+                                amenities=[wifi.id, pool.id]),
+                         [self.places[0]])
+        self.assertEqual(search(amenities=[wifi.id, "missing"]), [])
+
+    def test_load(self):
+        """Test that the eager loading option is accepted and ignored"""
+        self.storage.queries(reset=True)
+        self.assertEqual(self.storage.filter(City, state_id=self.state.id,
+                                             load=["places"]), self.cities)
+        self.assertIs(self.storage.get(State, self.state.id,
+                                       load={"cities.places": "joined"}),
+                      self.state)
+        self.assertEqual(self.storage.queries(), 0)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageIndexes(unittest.TestCase):
+    """Test the attribute indexes the models declare"""
+    def setUp(self):
+        """Adds users and places to an empty storage saving to index.json"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "index.json"
+        self.storage = FileStorage()
+        self.users = [User(email="user{}@hbnb.io".format(i))
+                      for i in range(3)]
+        self.places = [Place(name="place{}".format(i),
+                             price_by_night=(7 * i) % 10)
+                       for i in range(10)]
+        for obj in self.users + self.places:
+            self.storage.new(obj)
+        self.storage.save()
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("index.json"):
+            remove("index.json")
+
+    def prices(self, **criteria):
+        """returns the prices of the places matching criteria"""
+        return [place.price_by_night
+                for place in self.storage.filter(Place, **criteria)]
+
+    def test_declared(self):
+        """Test that the declared attributes are indexed"""
+        self.assertIn("email", file_storage.hash_indexes["User"])
+        self.assertIn("price_by_night", file_storage.sorted_indexes["Place"])
+
+    def test_hash(self):
+        """Test equality lookups through a declared hash index"""
+        self.assertIs(self.storage.find_one(User, email="user1@hbnb.io"),
+                      self.users[1])
+        self.assertEqual(self.storage.filter(User, email="x@hbnb.io"), [])
+
+    def test_sorted(self):
+        """Test range lookups through a sorted index, in value order"""
+        self.assertEqual(self.prices(price_by_night__gte=7), [7, 8, 9])
+        self.assertEqual(self.prices(price_by_night__lt=2), [0, 1])
+        self.assertEqual(self.prices(price_by_night__in=[5, 3, 11]), [5, 3])
+        self.assertEqual(self.prices(price_by_night__gt=4,
+                                     price_by_night__lte=6), [5, 6])
+
+    def test_setattr_and_save(self):
+        """Test that the indexes follow the changes saved"""
+        self.assertEqual(self.prices(price_by_night__gte=9), [9])
+        place = self.storage.find_one(Place, price_by_night=9)
+        place.price_by_night = 2
+        self.storage.new(place)
+        self.storage.save()
+        self.assertEqual(self.prices(price_by_night__gte=9), [])
+        self.assertEqual(self.prices(price_by_night=2), [2, 2])
+        self.users[0].email = "new@hbnb.io"
+        self.storage.new(self.users[0])
+        self.assertIs(self.storage.find_one(User, email="new@hbnb.io"),
+                      self.users[0])
+        self.assertIsNone(self.storage.find_one(User, email="user0@hbnb.io"))
+
+    def test_reload(self):
+        """Test that the indexes are right after reload, lazy or not"""
+        self.assertEqual(self.prices(price_by_night__lt=3), [0, 1, 2])
+        for lazy in (False, True):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(lazy=lazy)
+            storage.reload()
+            self.assertEqual(self.prices(price_by_night__lt=3), [0, 1, 2])
+            self.assertEqual(storage.find_one(User,
+                                              email="user2@hbnb.io").id,
+                             self.users[2].id)
+
+    def test_built_when_queried(self):
+        """Test that reload leaves the indexes of a class to its queries"""
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(FileStorage._FileStorage__attr_values, {})
+        self.assertEqual(self.storage.find_one(User,
+                                               email="user1@hbnb.io").id,
+                         self.users[1].id)
+        self.assertEqual(FileStorage._FileStorage__attr_indexed, {"User"})
+        self.assertEqual(len(FileStorage._FileStorage__attr_values), 3)
+
+    def test_uncomparable(self):
+        """Test that values of other types are left to the scan"""
+        place = self.storage.find_one(Place, price_by_night=0)
+        place.price_by_night = "free"
+        self.storage.new(place)
+        self.assertEqual(self.prices(price_by_night__lt=1), [])
+        self.assertEqual(self.prices(price_by_night="free"), ["free"])
+        self.assertEqual(self.prices(price_by_night__lt="g"), ["free"])
+
+    def test_unhashable(self):
+        """Test that unhashable values are left out of the indexes"""
+        user = User(email=["a@hbnb.io", "b@hbnb.io"])
+        self.storage.new(user)
+        self.storage.save()
+        self.assertIs(self.storage.find_one(User, email=user.email), user)
+        self.assertEqual(self.storage.filter(User, email__in=[user.email]),
+                         [user])
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.get(User, user.id).email, user.email)
+        self.assertEqual(self.storage.count(User), 4)
+        self.storage.delete(self.storage.get(User, user.id))
+        self.assertEqual(self.storage.count(User), 3)
+
+    def test_invalid_record(self):
+        """Test that a record no object can be built from is kept aside"""
+        with open("index.json", "r") as f:
+            js = json.load(f)
+        invalid = {"id": "1", "created_at": "yesterday",
+                   "__class__": "Place"}
+        js["Place.1"] = invalid
+        with open("index.json", "w") as f:
+            json.dump(js, f)
+        invalids = self.storage.stats()["invalid"]
+        for lazy in (False, True):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(lazy=lazy, journal=False, layout="single")
+            storage.reload()
+            self.assertIsNone(storage.get(Place, "1"))
+            self.assertEqual(len(storage.all(Place)), 10)
+            storage.new(State(name="Utah"))
+            storage.save()
+            with open("index.json", "r") as f:
+                self.assertEqual(json.load(f)["Place.1"], invalid)
+        self.assertEqual(storage.stats()["invalid"], invalids + 2)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStoragePages(unittest.TestCase):
+    """Test the keyset pagination of all() and filter()"""
+    def setUp(self):
+        """Adds states created two by two to a storage saving to page.json"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "page.json"
+        self.storage = FileStorage()
+        start = datetime(2017, 9, 28, 21, 3, 54)
+        self.states = [State(name="state{}".format(i),
+                             id="{:02}".format(9 - i),
+                             created_at=start + timedelta(seconds=i // 2))
+                       for i in range(10)]
+        for state in reversed(self.states):
+            self.storage.new(state)
+        self.storage.new(City(name="city", state_id="09", id="065",
+                              created_at=start + timedelta(seconds=1)))
+        self.storage.save()
+        # (created_at, id) order: ties on created_at are ordered by id
+        self.order = sorted(self.states,
+                            key=lambda state: (state.created_at, state.id))
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__file_path = "file.json"
+        for name in ("page.json", "page.idx"):
+            if path.exists(name):
+                remove(name)
+
+    def pages(self, limit, storage=None, cls=State, **criteria):
+        """returns the ids of each page of cls, following the cursors"""
+        storage = storage or self.storage
+        pages = []
+        after = None
+        while True:
+            if criteria:
+                objs = storage.filter(cls, limit=limit, after=after,
+                                      **criteria)
+            else:
+                objs = list(storage.all(cls, limit, after).values())
+            if not objs:
+                return pages
+            pages.append([obj.id for obj in objs])
+            after = pagination.encode(objs[-1])
+
+    def test_pages(self):
+        """Test that the pages cover the class once, in order"""
+        ids = [state.id for state in self.order]
+        self.assertEqual(ids[:3], ["08", "09", "06"])
+        self.assertEqual(self.pages(3), [ids[0:3], ids[3:6], ids[6:9],
+                                         ids[9:]])
+        self.assertEqual(self.pages(100), [ids])
+        self.assertEqual(len(self.storage.all(State)), 10)
+
+    def test_changes(self):
+        """Test that added and deleted objects are picked up"""
+        first = list(self.storage.all(State, 4).values())
+        after = pagination.encode(first[-1])
+        self.storage.delete(self.order[4])
+        late = State(name="late")
+        self.storage.new(late)
+        rest = [obj.id for obj in self.storage.all(State, after=after)
+                .values()]
+        self.assertEqual(rest, [state.id for state in self.order[5:]] +
+                         [late.id])
+
+    def test_all_classes(self):
+        """Test that the pages of every class are merged"""
+        keys = list(self.storage.all(limit=5))
+        self.assertEqual(keys[:4], ["State.08", "State.09", "State.06",
+                                    "City.065"])
+        self.assertEqual(len(keys), 5)
+
+    def test_reload(self):
+        """Test the pages of reloaded objects, lazy or mapped"""
+        ids = self.pages(4)
+        for lazy, file_path in ((True, "page.json"), (False, "page.idx")):
+            FileStorage._FileStorage__file_path = file_path
+            self.storage.migrate("single")
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(lazy=lazy)
+            storage.reload()
+            self.assertEqual(self.pages(4, storage), ids)
+
+    def test_filter(self):
+        """Test the pages of filter()"""
+        ids = [state.id for state in self.order if state.name != "state3"]
+        self.assertEqual(self.pages(4, name__ne="state3"),
+                         [ids[0:4], ids[4:8], ids[8:]])
+        self.assertEqual(self.pages(2, cls=City, state_id="09"),
+                         [["065"]])
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.storage.all(State, 2, "not a cursor")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageBulk(unittest.TestCase):
+    """Test bulk_new and bulk_save"""
+    def setUp(self):
+        """Empties the storage saving to bulk.json"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "bulk.json"
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restores the objects and removes the file"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = "file.json"
+        if path.exists("bulk.json"):
+            remove("bulk.json")
+
+    def test_single_write(self):
+        """Test that the objects are written by a single write"""
+        states = [State(name="state{}".format(i)) for i in range(100)]
+        writes = self.storage.stats()["writes"]
+        self.storage.bulk_new(states + [None])
+        self.storage.bulk_save()
+        self.assertEqual(self.storage.stats()["writes"], writes + 1)
+        self.assertEqual(self.storage.count(State), 100)
+        self.assertIs(self.storage.find_one(State, name="state7"), states[7])
+        with open("bulk.json") as f:
+            self.assertEqual(len(json.load(f)), 100)
+
+    def test_upsert(self):
+        """Test that re-running an import replaces the objects"""
+        state = State(name="Utah")
+        self.storage.bulk_new([state])
+        self.storage.bulk_save()
+        again = State(**dict(state.to_dict(), name="Ohio"))
+        self.storage.bulk_new([again], upsert=True)
+        self.storage.bulk_save()
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(self.storage.get(State, state.id).name, "Ohio")
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Contains the TestJsonStreamDocs and TestIterload classes
+"""
+
+import io
+import json
+from models.engine import json_stream
+import pep8
+import unittest
+
+iterload = json_stream.iterload
+
+
+class TestJsonStreamDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_stream"""
+    def test_pep8_conformance_json_stream(self):
+        """Test that models/engine/json_stream.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_stream.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_json_stream(self):
+        """Test tests/test_models/test_engine/test_json_stream.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_json_stream.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_stream_module_docstring(self):
+        """Test for the json_stream.py module docstring"""
+        self.assertIsNot(json_stream.__doc__, None,
+                         "json_stream.py needs a docstring")
+
+    def test_iterload_docstring(self):
+        """Test for the iterload docstring"""
+        self.assertIsNot(iterload.__doc__, None,
+                         "iterload needs a docstring")
+
+
+class TestIterload(unittest.TestCase):
+    """Test the iterload function"""
+    def setUp(self):
+        """Builds a JSON object shaped like file.json"""
+        self.objs = {}
+        for i in range(20):
+            self.objs["Place.{}".format(i)] = {
+                "id": str(i), "name": 'a "quoted", {braced} name' * i,
+                "latitude": -12.5e-3 * i, "max_guest": 10 ** i,
+                "amenity_ids": ["x", "y"], "description": None,
+                "__class__": "Place"}
+
+    def test_every_chunk_size(self):
+        """Test that entries cut by chunk boundaries are decoded right"""
+        for text in (json.dumps(self.objs), json.dumps(self.objs, indent=4)):
+            for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+                with self.subTest(chunk_size=chunk_size):
+                    f = io.StringIO(text)
+                    self.assertEqual(dict(iterload(f, chunk_size)),
+                                     self.objs)
+
+    def test_text(self):
+        """Test that text gives the JSON text of every value"""
+        text = json.dumps(self.objs, indent=4)
+        for chunk_size in (1, 7, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                entries = list(iterload(io.StringIO(text), chunk_size, True))
+                self.assertEqual({key: value for key, value, _ in entries},
+                                 self.objs)
+                for key, value, raw in entries:
+                    self.assertEqual(json.loads(raw), value)
+
+    def test_empty_object(self):
+        """Test that an empty object yields nothing"""
+        self.assertEqual(list(iterload(io.StringIO("{}"))), [])
+        self.assertEqual(list(iterload(io.StringIO(" {\n} "), 1)), [])
+
+    def test_invalid(self):
+        """Test that anything but a complete JSON object raises"""
+        for text in ("", "[1]", '{"a": 1', '{"a" 1}', '{"a": 1,}',
+                     '{1: 2}'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iterload(io.StringIO(text), 2))
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+"""
+Contains the TestLocksDocs, TestRWLock and TestFileLock classes
+"""
+
+from models.engine import locks
+from os import path, remove
+import pep8
+import threading
+import unittest
+
+FileLock = locks.FileLock
+RWLock = locks.RWLock
+
+
+class TestLocksDocs(unittest.TestCase):
+    """Tests to check the documentation and style of locks"""
+    def test_pep8_conformance_locks(self):
+        """Test that models/engine/locks.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/locks.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_locks(self):
+        """Test tests/test_models/test_engine/test_locks.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_locks.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_locks_module_docstring(self):
+        """Test for the locks.py module docstring"""
+        self.assertIsNot(locks.__doc__, None,
+                         "locks.py needs a docstring")
+
+    def test_rwlock_docstrings(self):
+        """Test for the RWLock docstrings"""
+        self.assertIsNot(RWLock.__doc__, None, "RWLock needs a docstring")
+        for name in ("acquire_read", "release_read", "acquire_write",
+                     "release_write", "read", "write"):
+            self.assertIsNot(getattr(RWLock, name).__doc__, None,
+                             "{} needs a docstring".format(name))
+
+    def test_filelock_docstrings(self):
+        """Test for the FileLock docstrings"""
+        self.assertIsNot(FileLock.__doc__, None, "FileLock needs a docstring")
+        for name in ("__init__", "__enter__", "__exit__", "version", "bump"):
+            self.assertIsNot(getattr(FileLock, name).__doc__, None,
+                             "{} needs a docstring".format(name))
+
+
+class TestRWLock(unittest.TestCase):
+    """Test the RWLock class"""
+    def setUp(self):
+        """Creates the lock"""
+        self.lock = RWLock()
+
+    def run_thread(self, target):
+        """runs target in a thread, returns whether it finished in time"""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(0.2)
+        return not thread.is_alive()
+
+    def test_readers_share(self):
+        """Test that readers do not wait for each other"""
+        with self.lock.read():
+            self.assertTrue(self.run_thread(self.lock.acquire_read))
+
+    def test_writer_excludes(self):
+        """Test that a writer waits for readers and readers for writers"""
+        with self.lock.read():
+            self.assertFalse(self.run_thread(self.lock.acquire_write))
+        # the waiting writer holds the lock as soon as the reader is gone
+        self.assertFalse(self.run_thread(self.lock.acquire_read))
+        self.assertFalse(self.run_thread(self.lock.acquire_write))
+
+    def test_waiting_writer_blocks_new_readers(self):
+        """Test that readers arriving after a writer wait for it"""
+        self.lock.acquire_read()
+        self.run_thread(self.lock.acquire_write)
+        self.assertFalse(self.run_thread(self.lock.acquire_read))
+
+    def test_reentrant(self):
+        """Test that the holder can take the lock again"""
+        with self.lock.write():
+            with self.lock.write(), self.lock.read():
+                pass
+            self.assertFalse(self.run_thread(self.lock.acquire_read))
+        with self.lock.read():
+            self.run_thread(self.lock.acquire_write)
+            with self.lock.read():
+                pass
+
+    def test_no_upgrade(self):
+        """Test that a reader cannot become the writer"""
+        with self.lock.read():
+            with self.assertRaises(RuntimeError):
+                self.lock.acquire_write()
+        self.assertTrue(self.run_thread(self.lock.acquire_write))
+
+
+class TestFileLock(unittest.TestCase):
+    """Test the FileLock class"""
+    def tearDown(self):
+        """Removes the lock file"""
+        if path.exists("test.lock"):
+            remove("test.lock")
+
+    def run_thread(self, target):
+        """runs target in a thread, returns whether it finished in time"""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(0.2)
+        return not thread.is_alive()
+
+    def lock_and_release(self, exclusive):
+        """returns a function taking and releasing the lock"""
+        def target():
+            """takes and releases the lock"""
+            with FileLock("test.lock", exclusive):
+                pass
+        return target
+
+    def test_version(self):
+        """Test that the version starts at 0 and bump increments it"""
+        with FileLock("test.lock") as lock:
+            self.assertEqual(lock.version(), 0)
+            self.assertEqual(lock.bump(), 1)
+        with FileLock("test.lock", exclusive=False) as lock:
+            self.assertEqual(lock.version(), 1)
+
+    def test_exclusive(self):
+        """Test that the exclusive lock keeps every other holder out"""
+        with FileLock("test.lock", exclusive=False):
+            self.assertTrue(self.run_thread(self.lock_and_release(False)))
+            self.assertFalse(self.run_thread(self.lock_and_release(True)))
+        with FileLock("test.lock"):
+            self.assertFalse(self.run_thread(self.lock_and_release(False)))
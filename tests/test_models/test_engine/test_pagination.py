@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+Contains the TestPaginationDocs and TestPagination classes
+"""
+
+from datetime import datetime
+from models.engine import pagination
+from models.state import State
+import pep8
+import unittest
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of pagination"""
+    def test_pep8_conformance_pagination(self):
+        """Test that models/engine/pagination.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_pagination(self):
+        """Test tests/test_models/test_engine/test_pagination.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pagination_module_docstring(self):
+        """Test for the pagination.py module docstring"""
+        self.assertIsNot(pagination.__doc__, None,
+                         "pagination.py needs a docstring")
+
+    def test_pagination_func_docstrings(self):
+        """Test for the encode and decode docstrings"""
+        for func in (pagination.encode, pagination.decode):
+            self.assertIsNot(func.__doc__, None,
+                             "{} needs a docstring".format(func.__name__))
+
+
+class TestPagination(unittest.TestCase):
+    """Test the encode and decode functions"""
+    def test_round_trip(self):
+        """Test that decode returns the position encode was given"""
+        created_at = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        state = State(id="a|b", created_at=created_at)
+        cursor = pagination.encode(state)
+        self.assertRegex(cursor, "^[A-Za-z0-9_=-]+$")
+        self.assertEqual(pagination.decode(cursor), (created_at, "a|b"))
+
+    def test_invalid(self):
+        """Test that malformed cursors raise ValueError"""
+        for cursor in ("", "???", "bm90IGEgY3Vyc29y", "MjAxNy0wOS0yOA==",
+                       None):
+            with self.assertRaises(ValueError):
+                pagination.decode(cursor)
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializersDocs, TestBinarySerializer and
+TestIndexedSerializer classes
+"""
+
+from datetime import datetime
+import io
+import json
+from models.base_model import time
+from os import path, remove
+from models.engine import serializers
+from models.place import Place
+from models.state import State
+import pep8
+import unittest
+
+BinarySerializer = serializers.BinarySerializer
+IndexedSerializer = serializers.IndexedSerializer
+
+
+class TestSerializersDocs(unittest.TestCase):
+    """Tests to check the documentation and style of serializers"""
+    def test_pep8_conformance_serializers(self):
+        """Test that models/engine/serializers.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_serializers(self):
+        """Test tests/test_models/test_engine/test_serializers.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializers_module_docstring(self):
+        """Test for the serializers.py module docstring"""
+        self.assertIsNot(serializers.__doc__, None,
+                         "serializers.py needs a docstring")
+
+    def test_serializer_class_docstrings(self):
+        """Test for the serializer class docstrings"""
+        for serializer in serializers.serializers.values():
+            self.assertIsNot(serializer.__doc__, None,
+                             "{} needs a docstring".format(serializer))
+
+
+class TestBinarySerializer(unittest.TestCase):
+    """Test the BinarySerializer class"""
+    def setUp(self):
+        """Builds a snapshot shaped like file.json"""
+        self.objs = {}
+        for i in range(10):
+            for obj in (State(name="state {}".format(i)),
+                        Place(city_id="c1", name="café", max_guest=i,
+                              latitude=-1.5 * i, amenity_ids=["a", "b"])):
+                self.objs[obj.__class__.__name__ + "." + obj.id] = \
+                    obj.to_dict()
+        self.objs["Place.7"] = {"id": "7", "created_at": "yesterday",
+                                "number_rooms": 1 << 70, "description": None,
+                                "__class__": "Place"}
+
+    def dump(self):
+        """returns the snapshot of self.objs"""
+        f = io.BytesIO()
+        BinarySerializer.dump(self.objs, f)
+        return f.getvalue()
+
+    def test_round_trip(self):
+        """Test that iterload gives back what dump wrote"""
+        data = self.dump()
+        loaded = dict(BinarySerializer.iterload(io.BytesIO(data)))
+        for attrs in loaded.values():
+            for attr in ("created_at", "updated_at"):
+                if isinstance(attrs.get(attr), datetime):
+                    attrs[attr] = attrs[attr].strftime(time)
+        self.assertEqual(loaded, self.objs)
+
+    def test_datetimes(self):
+        """Test that timestamps load as datetimes BaseModel keeps"""
+        data = self.dump()
+        for key, attrs in BinarySerializer.iterload(io.BytesIO(data)):
+            if key != "Place.7":
+                obj = Place(**attrs) if key[0] == "P" else State(**attrs)
+                self.assertEqual(obj.to_dict(), self.objs[key])
+
+    def test_timestamp_strings(self):
+        """Test that strings shaped like timestamps load as strings"""
+        state = State(name="2020-01-01T00:00:00.000000")
+        f = io.BytesIO()
+        BinarySerializer.dump({"State." + state.id: state.to_dict()}, f)
+        f.seek(0)
+        attrs = dict(BinarySerializer.iterload(f))["State." + state.id]
+        self.assertEqual(attrs["name"], "2020-01-01T00:00:00.000000")
+        self.assertIsInstance(attrs["created_at"], datetime)
+
+    def test_json_datetimes(self):
+        """Test that the JSON format writes datetimes as file.json does"""
+        state = State()
+        attrs = dict(state.to_dict(), created_at=state.created_at)
+        f = io.StringIO()
+        serializers.JSONSerializer.dump({"State.1": attrs}, f)
+        self.assertEqual(json.loads(f.getvalue()),
+                         {"State.1": state.to_dict()})
+
+    def test_compact(self):
+        """Test that the snapshot is smaller than the JSON text"""
+        self.assertLess(len(self.dump()), len(json.dumps(self.objs)) / 2)
+
+    def test_version(self):
+        """Test that other formats and versions are refused"""
+        data = bytearray(self.dump())
+        data[len(BinarySerializer.MAGIC)] += 1
+        for bad in (b"{}", bytes(data)):
+            with self.assertRaises(ValueError):
+                list(BinarySerializer.iterload(io.BytesIO(bad)))
+
+
+class TestIndexedSerializer(unittest.TestCase):
+    """Test the IndexedSerializer and MappedSnapshot classes"""
+    def setUp(self):
+        """Writes a few states to snapshot.idx"""
+        self.objs = {}
+        for i in range(10):
+            state = State(name="état {}".format(i))
+            self.objs["State." + state.id] = state.to_dict()
+        with open("snapshot.idx", "wb") as f:
+            IndexedSerializer.dump(self.objs, f)
+
+    def tearDown(self):
+        """Removes the snapshot"""
+        if path.exists("snapshot.idx"):
+            remove("snapshot.idx")
+
+    def test_round_trip(self):
+        """Test that iterload gives back what dump wrote"""
+        with open("snapshot.idx", "rb") as f:
+            self.assertEqual(dict(IndexedSerializer.iterload(f)), self.objs)
+
+    def test_load(self):
+        """Test that a mapped snapshot decodes single records by key"""
+        with open("snapshot.idx", "rb") as f:
+            snapshot = IndexedSerializer.map(f)
+        self.assertEqual(len(snapshot), 10)
+        self.assertEqual(snapshot.keys, sorted(self.objs))
+        for key, attrs in self.objs.items():
+            self.assertEqual(snapshot.load(key), attrs)
+        with self.assertRaises(KeyError):
+            snapshot.load("State.0")
+
+    def test_not_indexed(self):
+        """Test that other formats are refused"""
+        with open("snapshot.idx", "wb") as f:
+            BinarySerializer.dump(self.objs, f)
+        with open("snapshot.idx", "rb") as f:
+            with self.assertRaises(ValueError):
+                IndexedSerializer.map(f)
+
+
+class TestDetect(unittest.TestCase):
+    """Test that detect() tells the format of a snapshot"""
+    def tearDown(self):
+        """Removes the snapshot"""
+        if path.exists("snapshot.json"):
+            remove("snapshot.json")
+
+    def test_detect(self):
+        """Test every format, whatever the extension of the file"""
+        state = State(name="Texas")
+        objs = {"State." + state.id: state.to_dict()}
+        for name, serializer in serializers.serializers.items():
+            with open("snapshot.json", "w" + serializer.mode) as f:
+                serializer.dump(objs, f)
+            self.assertEqual(serializers.detect("snapshot.json"), name)
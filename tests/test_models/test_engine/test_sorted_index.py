@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Contains the TestSortedIndexDocs and TestSortedIndex classes
+"""
+
+from models.engine import sorted_index
+import pep8
+import unittest
+
+SortedIndex = sorted_index.SortedIndex
+
+
+class TestSortedIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of sorted_index"""
+    def test_pep8_conformance_sorted_index(self):
+        """Test that models/engine/sorted_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sorted_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sorted_index(self):
+        """Test tests/test_models/test_engine/test_sorted_index.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sorted_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sorted_index_module_docstring(self):
+        """Test for the sorted_index.py module docstring"""
+        self.assertIsNot(sorted_index.__doc__, None,
+                         "sorted_index.py needs a docstring")
+
+    def test_sorted_index_docstrings(self):
+        """Test for the SortedIndex docstrings"""
+        self.assertIsNot(SortedIndex.__doc__, None,
+                         "SortedIndex needs a docstring")
+        for name in ("__init__", "__len__", "add", "remove", "count",
+                     "keys", "keys_after"):
+            self.assertIsNot(getattr(SortedIndex, name).__doc__, None,
+                             "{} needs a docstring".format(name))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test the SortedIndex class"""
+    def setUp(self):
+        """Indexes the keys k0 to k9 under the values 0, 0, 1, 1, ..."""
+        SortedIndex.LOAD = 2
+        self.index = SortedIndex((i // 2, "k{}".format(i))
+                                 for i in reversed(range(10)))
+
+    def tearDown(self):
+        """Restores the block size"""
+        SortedIndex.LOAD = 1000
+
+    def test_keys(self):
+        """Test each kind of bound, the keys coming in value order"""
+        self.assertEqual(self.index.keys(2, 2), ["k4", "k5"])
+        self.assertEqual(self.index.keys(None, 1, high_closed=False),
+                         ["k0", "k1"])
+        self.assertEqual(self.index.keys(None, 1), ["k0", "k1", "k2", "k3"])
+        self.assertEqual(self.index.keys(3, low_closed=False), ["k8", "k9"])
+        self.assertEqual(self.index.keys(1, 3, False, False), ["k4", "k5"])
+        self.assertEqual(self.index.keys(7, 7), [])
+        self.assertEqual(self.index.keys(3, 1), [])
+        self.assertEqual(len(self.index.keys()), 10)
+
+    def test_count(self):
+        """Test that count agrees with keys"""
+        for bounds in ((2, 2), (None, 1), (1, 3, False, True), (5,)):
+            self.assertEqual(self.index.count(*bounds),
+                             len(self.index.keys(*bounds)))
+
+    def test_keys_after(self):
+        """Test that keys_after pages through the pairs across blocks"""
+        self.assertEqual(self.index.keys_after(limit=3), ["k0", "k1", "k2"])
+        self.assertEqual(self.index.keys_after(1, "k2", 3),
+                         ["k3", "k4", "k5"])
+        self.assertEqual(self.index.keys_after(1, "k25", 2), ["k3", "k4"])
+        self.assertEqual(self.index.keys_after(1, "k4"), ["k4", "k5", "k6",
+                                                          "k7", "k8", "k9"])
+        self.assertEqual(self.index.keys_after(4, "k9"), [])
+        self.assertEqual(self.index.keys_after(9, "k"), [])
+        self.assertEqual(SortedIndex().keys_after(), [])
+
+    def test_add_remove(self):
+        """Test that add and remove keep the index sorted across blocks"""
+        self.index.add(2, "k45")
+        self.assertEqual(self.index.keys(2, 2), ["k4", "k45", "k5"])
+        self.index.remove(2, "k4")
+        self.index.remove(2, "missing")
+        self.index.remove(9, "k5")
+        self.assertEqual(self.index.keys(2, 2), ["k45", "k5"])
+        self.assertEqual(len(self.index), 10)
+        for i in range(10):
+            self.index.remove(i // 2, "k{}".format(i))
+        self.assertEqual(self.index.keys(), ["k45"])
+        self.index.remove(2, "k45")
+        self.index.add(0, "k")
+        self.assertEqual(self.index.keys(), ["k"])
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+import os
+import pep8
+import unittest
+from os import environ
+from models.engine import db_storage, sqlite_storage
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqls_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1,
+                        "SQLiteStorage class needs a docstring")
+
+    def test_sqls_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqls_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the engine of the SQLiteStorage class"""
+    def setUp(self):
+        """Configures a SQLiteStorage on sqlite.db"""
+        self.env = {"HBNB_SQLITE_PATH": "sqlite.db",
+                    "HBNB_SQLITE_SYNCHRONOUS": "FULL",
+                    "HBNB_SQLITE_CACHE_SIZE": "1024",
+                    "HBNB_SQLITE_POOL_SIZE": "2"}
+        # HBNB_ENV=test would drop the tables, checking a connection out
+        self.save = {name: environ.get(name)
+                     for name in list(self.env) + ["HBNB_ENV"]}
+        environ.update(self.env)
+        environ.pop("HBNB_ENV", None)
+        self.storage = SQLiteStorage()
+        self.engine = self.storage._DBStorage__engine
+
+    def tearDown(self):
+        """Restores the environment and removes the database"""
+        self.engine.dispose()
+        for name, value in self.save.items():
+            if value is None:
+                environ.pop(name, None)
+            else:
+                environ[name] = value
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists("sqlite.db" + suffix):
+                os.remove("sqlite.db" + suffix)
+
+    def pragma(self, connection, name):
+        """returns the value of a pragma on connection"""
+        return connection.exec_driver_sql("PRAGMA " + name).scalar()
+
+    def test_file(self):
+        """Test that the database is the file of HBNB_SQLITE_PATH"""
+        self.assertEqual(self.engine.url.database, "sqlite.db")
+        with self.engine.connect() as connection:
+            self.pragma(connection, "user_version")
+        self.assertTrue(os.path.exists("sqlite.db"))
+
+    def test_pragmas(self):
+        """Test that every connection is configured by the environment"""
+        with self.engine.connect() as connection:
+            self.assertEqual(self.pragma(connection, "journal_mode"), "wal")
+            # FULL
+            self.assertEqual(self.pragma(connection, "synchronous"), 2)
+            self.assertEqual(self.pragma(connection, "cache_size"), -1024)
+            self.assertEqual(self.pragma(connection, "foreign_keys"), 1)
+
+    def test_pool(self):
+        """Test that the connections are pooled, one per checkout"""
+        pool = self.engine.pool
+        self.assertIsInstance(pool, db_storage.MeteredPool)
+        self.assertEqual(pool.size(), 2)
+        first, second = self.engine.connect(), self.engine.connect()
+        self.assertEqual(self.storage.stats()["checked_out"], 2)
+        first.close()
+        second.close()
+        self.assertEqual(self.storage.stats()["checked_in"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
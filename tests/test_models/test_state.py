@@ -8,6 +8,7 @@ import inspect
 import models
 from models import state
 from models.base_model import BaseModel
+from models.city import City
 import pep8
 import unittest
 State = state.State
@@ -103,3 +104,15 @@ class TestState(unittest.TestCase):
         state = State()
         string = "[State] ({}) {}".format(state.id, state.__dict__)
         self.assertEqual(string, str(state))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_cities(self):
+        """test that cities lists the cities stored for the state"""
+        state = State(name="Colorado")
+        other = State(name="Wyoming")
+        city = City(state_id=state.id, name="Denver")
+        models.storage.new(state)
+        models.storage.new(other)
+        models.storage.new(city)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(other.cities, [])
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Contains the TestShardLoaderDocs and TestReadShard classes
+"""
+
+from models.engine.serializers import serializers
+from models.state import State
+import os
+import pep8
+import shard_loader
+import tempfile
+import unittest
+
+
+class TestShardLoaderDocs(unittest.TestCase):
+    """Tests to check the documentation and style of shard_loader"""
+    def test_pep8_conformance_shard_loader(self):
+        """Test that shard_loader.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['shard_loader.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_shard_loader(self):
+        """Test that tests/test_shard_loader.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_shard_loader.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_shard_loader_module_docstring(self):
+        """Test for the shard_loader.py module docstring"""
+        self.assertIsNot(shard_loader.__doc__, None,
+                         "shard_loader.py needs a docstring")
+
+    def test_read_shard_docstring(self):
+        """Test for the read_shard docstring"""
+        self.assertIsNot(shard_loader.read_shard.__doc__, None,
+                         "read_shard needs a docstring")
+
+
+class TestReadShard(unittest.TestCase):
+    """Test the read_shard function"""
+    def test_every_format(self):
+        """Test that read_shard gives back what each serializer wrote"""
+        state = State(name="Nevada")
+        json_objects = {"State." + state.id: state.to_dict()}
+        for name, serializer in serializers.items():
+            with self.subTest(file_format=name):
+                fd, file_path = tempfile.mkstemp(serializer.extension)
+                self.addCleanup(os.remove, file_path)
+                with os.fdopen(fd, 'w' + serializer.mode) as f:
+                    serializer.dump(json_objects, f)
+                attrs = shard_loader.read_shard(file_path, name)
+                self.assertEqual(attrs["State." + state.id]["name"],
+                                 "Nevada")